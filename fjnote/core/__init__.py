@@ -2,10 +2,12 @@
 Core package
 """
 
-from .models import NoteType, FlashSession, TodoItem, NoteSearchResult
-from .exceptions import FJNoteException, BlinkoApiException, SessionException, CommandException
+from .models import NoteType, FlashSession, TodoItem, NoteItem, NoteSearchResult
+from .exceptions import (
+    FJNoteException, BlinkoApiException, BlinkoTransientException, SessionException, CommandException
+)
 
 __all__ = [
-    'NoteType', 'FlashSession', 'TodoItem', 'NoteSearchResult',
-    'FJNoteException', 'BlinkoApiException', 'SessionException', 'CommandException'
+    'NoteType', 'FlashSession', 'TodoItem', 'NoteItem', 'NoteSearchResult',
+    'FJNoteException', 'BlinkoApiException', 'BlinkoTransientException', 'SessionException', 'CommandException'
 ]
\ No newline at end of file
@@ -14,6 +14,11 @@ class BlinkoApiException(FJNoteException):
     pass
 
 
+class BlinkoTransientException(BlinkoApiException):
+    """Blinko API 瞬时故障（网络错误或 5xx），可以安全重试"""
+    pass
+
+
 class SessionException(FJNoteException):
     """会话管理异常"""  
     pass
@@ -1,14 +1,13 @@
 """
 Core Domain Models and Enums - 核心领域模型与枚举
 本模块定义了插件业务逻辑中使用的核心数据结构。
-使用 dataclasses 来创建简洁、类型安全的数据类。
+使用 dataclasses（slots=True，需 Python 3.10+）来创建简洁、类型安全且内存紧凑的数据类。
 """
 
 from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import List, Optional, Any, Dict
-import asyncio
 
 
 class NoteType(Enum):
@@ -21,7 +20,7 @@ class NoteType(Enum):
     TODO = 2    # 待办事项
 
 
-@dataclass
+@dataclass(slots=True)
 class FlashSession:
     """
     闪念会话数据模型
@@ -31,10 +30,11 @@ class FlashSession:
     messages: List[Dict[str, Any]]
     tags: List[str]
     created_at: datetime
-    timer_task: Optional[asyncio.Task] = None
+    expires_at: float = 0.0   # 超时时刻（事件循环时钟）
+    generation: int = 0       # 每次重置计时都会更新，用于识别调度堆中的过期条目
 
 
-@dataclass 
+@dataclass(slots=True)
 class TodoItem:
     """
     待办事项数据模型
@@ -49,7 +49,7 @@ class TodoItem:
     created_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class NoteItem:
     """
     标准笔记数据模型
@@ -63,7 +63,7 @@ class NoteItem:
     attachments: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class NoteSearchResult:
     """
     笔记搜索结果模型
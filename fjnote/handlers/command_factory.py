@@ -21,26 +21,32 @@ class CommandFactory:
         self._register_handlers()
     
     def _register_handlers(self):
-        """注册所有命令处理器"""
+        """注册所有命令处理器，别名共享同一个处理器实例（包括其缓存）"""
+        delete_handler = DeleteCommandHandler(self.plugin)
+        search_handler = SearchCommandHandler(self.plugin)
+        tags_handler = TagsCommandHandler(self.plugin)
         self._handlers.update({
             'todo': TodoCommandHandler(self.plugin),
             'list': ListCommandHandler(self.plugin),
             'done': DoneCommandHandler(self.plugin),
-            'del': DeleteCommandHandler(self.plugin),
-            'rm': DeleteCommandHandler(self.plugin),
+            'del': delete_handler,
+            'rm': delete_handler,
             'edit': EditCommandHandler(self.plugin),
             'note': NoteCommandHandler(self.plugin),
             'notes': NotesCommandHandler(self.plugin),
-            'find': SearchCommandHandler(self.plugin),
-            'search': SearchCommandHandler(self.plugin),
-            'tags': TagsCommandHandler(self.plugin),
-            'cats': TagsCommandHandler(self.plugin),
+            'find': search_handler,
+            'search': search_handler,
+            'tags': tags_handler,
+            'cats': tags_handler,
             'help': HelpCommandHandler(self.plugin)
         })
     
     def get_handler(self, command: str) -> Optional[ICommandHandler]:
-        """获取命令处理器"""
-        return self._handlers.get(command.lower())
+        """
+        获取命令处理器（热路径）。
+        注册时已统一为小写，调用方需传入已小写的命令名，此处不再重复转换。
+        """
+        return self._handlers.get(command)
     
     def register_handler(self, command: str, handler: ICommandHandler):
         """注册新的命令处理器"""
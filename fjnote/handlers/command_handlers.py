@@ -6,16 +6,88 @@ Command Handlers - 命令处理器
 - CommandFactory（在 command_factory.py 中）负责根据命令名称创建相应的处理器实例，解耦了请求者（主插件）与具体命令的实现。
 """
 
+import asyncio
 import re
+import time
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from typing import List, Dict, Any
-from dataclasses import asdict
 
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 from astrbot.api import logger
 
-from ..core.models import NoteType, TodoItem
-from ..core.exceptions import CommandException
+from ..core.models import NoteType
+
+# 截止时间标记（如 ~明天），在 #todo 中会被移除
+_DEADLINE_RE = re.compile(r'~\S+')
+
+# 卡片中笔记内容的截断长度：笔记列表 / 搜索结果
+_NOTE_PREVIEW_LIMIT = 120
+_SEARCH_PREVIEW_LIMIT = 100
+
+
+def _preview(text: str, limit: int) -> str:
+    """截取用于卡片展示的内容，超长时追加省略号；在进入模板前完成，模板中只需读取一次字段"""
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def _with_preview(notes: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """为搜索结果附加 display_content，复制而不修改原笔记字典（其可能来自列表缓存）"""
+    return [dict(note, display_content=_preview(note.get("content", ""), limit)) for note in notes]
+
+
+# #tags 渲染图片的缓存有效期（秒）
+_TAGS_RENDER_TTL = 60.0
+
+# 纯文本模式下的帮助内容
+_HELP_TEXT = """📖 FJNote 助手使用指南
+
+⚡ 闪念记录:
+- 直接发送消息即可开始记录闪念
+- 30秒内的连续消息会合并为一条闪念
+- 使用 #标签 为闪念添加标签
+
+📝 ToDo 管理:
+- #todo 任务内容 #分类 ~截止日期 - 添加待办
+- #list [分类] - 查看待办列表
+- #done 编号1 编号2... - 完成待办
+- #del/#rm 编号1 编号2... - 删除待办
+- #edit 编号 新内容 - 编辑待办
+
+🔍 搜索与管理:
+- #find/#search 关键词 - 全局搜索
+- #tags/#cats - 查看所有标签
+
+💡 使用技巧:
+- 支持发送图片和文件，会自动上传到Blinko
+- 日期格式: 2024-01-01, 明天, 下周一等"""
+
+
+def _parse_indices(args: List[str]) -> List[int]:
+    """单次遍历将参数解析为编号列表，忽略无法转换为整数的参数。"""
+    indices = []
+    for arg in args:
+        try:
+            indices.append(int(arg))
+        except ValueError:
+            pass
+    return indices
+
+
+async def _get_active_todos(api_client, recent_lists, user_id: str, max_index: int) -> List[Dict[str, Any]]:
+    """
+    获取用于解析显示编号的未归档待办列表。
+    优先使用用户最近一次 #list 看到的列表（编号与用户所见一致，且省去一次网络请求），
+    列表不存在、已过期或不包含所需编号时再向 Blinko 拉取。
+    """
+    recent = recent_lists.get(user_id)
+    if recent is not None and max_index <= len(recent):
+        return recent
+    return await api_client.list_notes(
+        note_type=NoteType.TODO.value, 
+        size=100, 
+        archived_status=False
+    )
 
 
 class ICommandHandler(ABC):
@@ -24,6 +96,22 @@ class ICommandHandler(ABC):
     定义了所有具体命令处理器必须实现的 `handle` 方法。
     """
     
+    def __init__(self, plugin):
+        """
+        从插件实例中取出处理器共用的依赖。
+        
+        :param plugin: 插件主类实例。
+        """
+        self.plugin = plugin
+        self.api_client = plugin.api_client
+        self.session_manager = plugin.session_manager
+        self.recent_lists = plugin.recent_lists
+        self.response_manager = plugin.response_manager
+        self.template_renderer = plugin.template_renderer
+        self.flash_strategy = plugin.flash_strategy
+        self.todo_strategy = plugin.todo_strategy
+        self.note_strategy = plugin.note_strategy
+    
     @abstractmethod
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """
@@ -39,9 +127,6 @@ class ICommandHandler(ABC):
 class TodoCommandHandler(ICommandHandler):
     """'#todo' 命令的具体处理器"""
     
-    def __init__(self, plugin):
-        self.plugin = plugin
-    
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 todo 命令"""
         if not args:
@@ -49,30 +134,29 @@ class TodoCommandHandler(ICommandHandler):
         
         try:
             content = " ".join(args)
-            tags = self.plugin.session_manager.extract_tags(content)
-            clean_content = self.plugin.session_manager.remove_tags(content).strip()
+            clean_content, tags = self.session_manager.split_content_and_tags(content)
             
             # 移除截止时间处理，简化为纯内容
-            clean_content = re.sub(r'~[^\s]+', '', clean_content).strip()
+            clean_content = _DEADLINE_RE.sub('', clean_content).strip()
             
-            # 构造包含标签的内容（blinko 会自动解析 #标签）
-            todo_content = clean_content
-            if tags:
-                todo_content += " " + " ".join(f"#{tag}" for tag in tags)
+            # 原始内容中已包含 #标签（blinko 会自动解析），只需移除截止时间
+            todo_content = _DEADLINE_RE.sub('', content).strip()
             
             # 不传递 tags 参数，让 blinko 从内容中解析
-            success = await self.plugin.todo_strategy.create(todo_content, [], dict(self.plugin.config))
+            success = await self.todo_strategy.create(todo_content, [], self.plugin.config_snapshot)
             
             if success:
+                # 新待办会改变列表编号，最近查看的列表不再与实际一致
+                self.recent_lists.forget(event.get_sender_id())
                 # 使用响应管理器
                 category = tags[0] if tags else None
-                response = self.plugin.response_manager.todo_created(clean_content, category)
+                response = self.response_manager.todo_created(clean_content, category)
                 if response:
                     return event.plain_result(response)
                 else:
                     return None  # 不响应
             else:
-                error_response = self.plugin.response_manager.error_general("添加待办失败，请检查Blinko连接")
+                error_response = self.response_manager.error_general("添加待办失败，请检查Blinko连接")
                 if error_response:
                     return event.plain_result(error_response)
                 else:
@@ -80,7 +164,7 @@ class TodoCommandHandler(ICommandHandler):
                 
         except Exception as e:
             logger.error(f"Todo command error: {e}")
-            error_response = self.plugin.response_manager.error_general("添加待办失败")
+            error_response = self.response_manager.error_general("添加待办失败")
             if error_response:
                 return event.plain_result(error_response)
             else:
@@ -90,27 +174,27 @@ class TodoCommandHandler(ICommandHandler):
 class ListCommandHandler(ICommandHandler):
     """'#list' 命令的具体处理器"""
     
-    def __init__(self, plugin):
-        self.plugin = plugin
-    
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 list 命令"""
         category = args[0] if args else None
         
         try:
             # 获取用户配置
-            page_size = self.plugin.config.get("ui_preferences", {}).get("list_page_size", 10)
-            show_timestamps = self.plugin.config.get("ui_preferences", {}).get("show_timestamps", True)
-            compact_mode = self.plugin.config.get("ui_preferences", {}).get("compact_mode", False)
+            ui = self.plugin.ui_preferences
+            page_size = ui.get("list_page_size", 10)
+            show_timestamps = ui.get("show_timestamps", True)
+            compact_mode = ui.get("compact_mode", False)
             
             # 默认只获取未归档的笔记
-            notes = await self.plugin.api_client.list_notes(
+            notes = await self.api_client.list_notes(
                 note_type=NoteType.TODO.value, 
                 size=page_size * 2,
                 archived_status=False
             )
+            # 记录用户看到的列表，后续 #done/#del/#edit 的编号据此解析
+            self.recent_lists.remember(event.get_sender_id(), notes)
             
-            todos_by_category = {}
+            todos_by_category = defaultdict(list)
             for i, note in enumerate(notes, 1):
                 content = note.get("content", "")
                 note_tags = note.get("tags", [])
@@ -119,22 +203,23 @@ class ListCommandHandler(ICommandHandler):
                 if category and category != note_category:
                     continue
                 
-                if note_category not in todos_by_category:
-                    todos_by_category[note_category] = []
-                
-                todo_item = TodoItem(
-                    id=i,
-                    note_id=note["id"],  # 存储真实的 note_id
-                    content=content,
-                    category=note_category,
-                    deadline=None,
-                    completed=note.get("isArchived", False)
-                )
-                
-                todos_by_category[note_category].append(asdict(todo_item))
+                # 直接构造与 TodoItem 字段一致的字典，省去 dataclass 实例化与 asdict 的深拷贝
+                todos_by_category[note_category].append({
+                    "id": i,
+                    "note_id": note["id"],  # 存储真实的 note_id
+                    "content": content,
+                    "category": note_category,
+                    "deadline": None,
+                    "completed": note.get("isArchived", False),
+                    "created_at": None
+                })
             
-            if self.plugin.config.get("enable_rich_display", True):
-                html = await self.plugin.template_renderer.render('todo_list', {
+            # 空结果直接回复文本，省去模板与图片渲染
+            if not todos_by_category:
+                return event.plain_result("暂无待办事项")
+            
+            if self.plugin.enable_rich_display:
+                html = self.template_renderer.render('todo_list', {
                     'todos': todos_by_category,
                     'category': category,
                     'show_timestamps': show_timestamps,
@@ -143,22 +228,21 @@ class ListCommandHandler(ICommandHandler):
                 image_url = await self.plugin.html_render(html, {})
                 return event.image_result(image_url)
             else:
-                text_result = f"📝 ToDo 列表{f' - {category}' if category else ''}\n"
+                parts = [f"📝 ToDo 列表{f' - {category}' if category else ''}\n"]
                 for cat, items in todos_by_category.items():
                     if cat:
-                        text_result += f"\n【{cat}】\n"
+                        parts.append(f"\n【{cat}】\n")
                     for todo in items[:page_size]:  # 限制显示数量
                         status = "☑" if todo['completed'] else "☐"
                         if compact_mode:
-                            text_result += f"[{todo['id']}] {status} {todo['content'][:30]}{'...' if len(todo['content']) > 30 else ''}\n"
+                            content = todo['content']
+                            ellipsis = '...' if len(content) > 30 else ''
+                            parts.append(f"[{todo['id']}] {status} {content[:30]}{ellipsis}\n")
                         else:
-                            text_result += f"[{todo['id']}] {status} {todo['content']}"
-                            if show_timestamps and todo.get('created_at'):
-                                text_result += f" ({todo['created_at']})"
-                            if todo['deadline']:
-                                text_result += f" ~{todo['deadline']}"
-                            text_result += "\n"
-                return event.plain_result(text_result or "暂无待办事项")
+                            timestamp = f" ({todo['created_at']})" if show_timestamps and todo.get('created_at') else ""
+                            deadline = f" ~{todo['deadline']}" if todo['deadline'] else ""
+                            parts.append(f"[{todo['id']}] {status} {todo['content']}{timestamp}{deadline}\n")
+                return event.plain_result("".join(parts))
         
         except Exception as e:
             logger.error(f"List command error: {e}")
@@ -168,65 +252,60 @@ class ListCommandHandler(ICommandHandler):
 class DoneCommandHandler(ICommandHandler):
     """'#done' 命令的具体处理器"""
     
-    def __init__(self, plugin):
-        self.plugin = plugin
-    
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 done 命令"""
         if not args:
             return event.plain_result("请提供要完成的待办编号。格式: #done 1 2 3")
         
         try:
-            todo_indices = [int(arg) for arg in args if arg.isdigit()]
+            todo_indices = _parse_indices(args)
             if not todo_indices:
                 return event.plain_result("请提供有效的待办编号")
             
             # 获取当前活动的待办列表，以确保索引正确
-            active_notes = await self.plugin.api_client.list_notes(
-                note_type=NoteType.TODO.value, 
-                size=100, 
-                archived_status=False
+            active_notes = await _get_active_todos(
+                self.api_client, self.recent_lists, event.get_sender_id(), max(todo_indices)
             )
             
-            completed_todos = []
-            for index in todo_indices:
-                if 1 <= index <= len(active_notes):
-                    note_to_complete = active_notes[index - 1]
-                    note_id = note_to_complete["id"]
-                    content = note_to_complete.get("content", "")
-                    
-                    # 通过 API 将笔记归档
-                    await self.plugin.api_client.update_note(note_id=note_id, is_archived=True)
-                    completed_todos.append({"id": str(index), "content": content})
+            # 一次性筛出有效编号（去重），无有效编号时提前返回
+            total = len(active_notes)
+            valid = [index for index in dict.fromkeys(todo_indices) if 1 <= index <= total]
+            if not valid:
+                error_response = self.response_manager.error_not_found("指定编号", "todo")
+                return event.plain_result(error_response) if error_response else None
+            
+            # 通过批量接口一次性将目标笔记归档；最近列表中已完成的笔记无需再次请求
+            targets = [(index, active_notes[index - 1]) for index in valid]
+            pending = [note for _, note in targets if not note.get("isArchived", False)]
+            if pending:
+                pending_ids = [note["id"] for note in pending]
+                await self.api_client.archive_notes(pending_ids)
+                # 替换为已归档的副本，不修改可能与 API 缓存共享的笔记对象
+                self.recent_lists.mark_archived(event.get_sender_id(), pending_ids)
+            completed_todos = [{"id": str(index), "content": note.get("content", "")} for index, note in targets]
             
             completed_count = len(completed_todos)
             # 使用响应管理器，支持单个和多个TODO的不同响应
             if completed_count == 1:
                 todo = completed_todos[0]
-                response = self.plugin.response_manager.todo_completed(todo["id"], todo["content"])
+                response = self.response_manager.todo_completed(todo["id"], todo["content"])
                 if response:
                     return event.plain_result(response)
                 else:
                     return None
-            elif completed_count > 1:
+            else:
                 # 对于多个TODO，使用通用成功响应
-                response = self.plugin.response_manager.get_response("todo_completed", 
+                response = self.response_manager.get_response("todo_completed", 
                                                                    id=f"{completed_count}个", 
                                                                    content="待办事项")
                 if response:
                     return event.plain_result(response)
                 else:
                     return None
-            else:
-                error_response = self.plugin.response_manager.error_not_found("指定编号", "todo")
-                if error_response:
-                    return event.plain_result(error_response)
-                else:
-                    return None
         
         except Exception as e:
             logger.error(f"Done command error: {e}")
-            error_response = self.plugin.response_manager.error_general("完成待办失败")
+            error_response = self.response_manager.error_general("完成待办失败")
             if error_response:
                 return event.plain_result(error_response)
             else:
@@ -236,63 +315,57 @@ class DoneCommandHandler(ICommandHandler):
 class DeleteCommandHandler(ICommandHandler):
     """'#del' 或 '#rm' 命令的具体处理器"""
     
-    def __init__(self, plugin):
-        self.plugin = plugin
-    
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 delete 命令"""
         if not args:
             return event.plain_result("请提供要删除的待办编号。格式: #del 1 2 3")
         
         try:
-            todo_indices = [int(arg) for arg in args if arg.isdigit()]
+            todo_indices = _parse_indices(args)
             if not todo_indices:
                 return event.plain_result("请提供有效的待办编号")
             
             # 获取当前活动的待办列表，以确保索引正确
-            active_notes = await self.plugin.api_client.list_notes(
-                note_type=NoteType.TODO.value, 
-                size=100, 
-                archived_status=False
+            active_notes = await _get_active_todos(
+                self.api_client, self.recent_lists, event.get_sender_id(), max(todo_indices)
             )
             
-            deleted_items = []
-            # 按索引降序删除，防止删除时列表变化导致索引错乱
-            for index in sorted(todo_indices, reverse=True):
-                if 1 <= index <= len(active_notes):
-                    note_to_delete = active_notes.pop(index - 1) # 从本地列表中也移除
-                    note_id = note_to_delete["id"]
-                    await self.plugin.api_client.delete_note(note_id)
-                    deleted_items.append({"id": str(index), "content": note_to_delete.get("content", "")})
+            # 一次性筛出有效编号（去重），无有效编号时提前返回
+            total = len(active_notes)
+            valid = [index for index in dict.fromkeys(todo_indices) if 1 <= index <= total]
+            if not valid:
+                error_response = self.response_manager.error_not_found("指定编号", "todo")
+                return event.plain_result(error_response) if error_response else None
+            
+            # 删除基于稳定的 note_id，通过批量接口一次性完成
+            targets = [(index, active_notes[index - 1]) for index in valid]
+            await self.api_client.delete_notes([note["id"] for _, note in targets])
+            # 已删除的笔记仍在最近列表中，继续沿用会把编号解析到已删除的笔记上
+            self.recent_lists.forget(event.get_sender_id())
+            deleted_items = [{"id": str(index), "content": note.get("content", "")} for index, note in targets]
             
             deleted_count = len(deleted_items)
             # 使用响应管理器
             if deleted_count == 1:
                 item = deleted_items[0]
-                response = self.plugin.response_manager.item_deleted(item["id"], "todo")
+                response = self.response_manager.item_deleted(item["id"], "todo")
                 if response:
                     return event.plain_result(response)
                 else:
                     return None
-            elif deleted_count > 1:
+            else:
                 # 对于多个项目，使用通用响应
-                response = self.plugin.response_manager.get_response("item_deleted", 
+                response = self.response_manager.get_response("item_deleted", 
                                                                    id=f"{deleted_count}个", 
                                                                    type="待办")
                 if response:
                     return event.plain_result(response)
                 else:
                     return None
-            else:
-                error_response = self.plugin.response_manager.error_not_found("指定编号", "todo")
-                if error_response:
-                    return event.plain_result(error_response)
-                else:
-                    return None
         
         except Exception as e:
             logger.error(f"Delete command error: {e}")
-            error_response = self.plugin.response_manager.error_general("删除待办失败")
+            error_response = self.response_manager.error_general("删除待办失败")
             if error_response:
                 return event.plain_result(error_response)
             else:
@@ -302,9 +375,6 @@ class DeleteCommandHandler(ICommandHandler):
 class EditCommandHandler(ICommandHandler):
     """'#edit' 命令的具体处理器"""
     
-    def __init__(self, plugin):
-        self.plugin = plugin
-    
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 edit 命令"""
         if len(args) < 2:
@@ -315,37 +385,29 @@ class EditCommandHandler(ICommandHandler):
             new_content = " ".join(args[1:])
             
             # 获取当前活动的待办列表
-            active_notes = await self.plugin.api_client.list_notes(
-                note_type=NoteType.TODO.value, 
-                size=100, 
-                archived_status=False
+            active_notes = await _get_active_todos(
+                self.api_client, self.recent_lists, event.get_sender_id(), index
             )
             
             if 1 <= index <= len(active_notes):
                 note_to_edit = active_notes[index - 1]
                 note_id = note_to_edit["id"]
                 
-                # 提取新内容中的标签
-                tags = self.plugin.session_manager.extract_tags(new_content)
-                clean_content = self.plugin.session_manager.remove_tags(new_content).strip()
-                
-                # 构造包含标签的完整内容，让Blinko处理
-                final_content = clean_content
-                if tags:
-                    final_content += " " + " ".join(f"#{tag}" for tag in tags)
+                # 新内容中已包含 #标签，直接交给 Blinko 解析；去除标签的内容仅用于回复
+                clean_content = self.session_manager.remove_tags(new_content)
                 
-                await self.plugin.api_client.update_note(
+                await self.api_client.update_note(
                     note_id=note_id, 
-                    content=final_content
+                    content=new_content
                 )
                 
-                response = self.plugin.response_manager.todo_edited(str(index), clean_content)
+                response = self.response_manager.todo_edited(str(index), clean_content)
                 if response:
                     return event.plain_result(response)
                 else:
                     return None
             else:
-                error_response = self.plugin.response_manager.error_not_found(str(index), "todo")
+                error_response = self.response_manager.error_not_found(str(index), "todo")
                 if error_response:
                     return event.plain_result(error_response)
                 else:
@@ -361,9 +423,6 @@ class EditCommandHandler(ICommandHandler):
 class SearchCommandHandler(ICommandHandler):
     """'#search' 或 '#find' 命令的具体处理器"""
     
-    def __init__(self, plugin):
-        self.plugin = plugin
-    
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 search 命令"""
         if not args:
@@ -372,33 +431,44 @@ class SearchCommandHandler(ICommandHandler):
         keyword = " ".join(args)
         
         try:
-            flash_notes = await self.plugin.flash_strategy.search(keyword)
-            todo_notes = await self.plugin.todo_strategy.search(keyword)
+            # 两类搜索互不依赖，并发执行；底层的相同搜索请求由 API 客户端合并
+            flash_notes, todo_notes = await asyncio.gather(
+                self.flash_strategy.search(keyword),
+                self.todo_strategy.search(keyword),
+                return_exceptions=True
+            )
+            # 单类搜索失败时降级为空结果，仍展示另一类的结果
+            if isinstance(flash_notes, Exception):
+                logger.error(f"Flash search error: {flash_notes}")
+                flash_notes = []
+            if isinstance(todo_notes, Exception):
+                logger.error(f"Todo search error: {todo_notes}")
+                todo_notes = []
             
-            if self.plugin.config.get("enable_rich_display", True):
-                html = await self.plugin.template_renderer.render('search_results', {
+            # 空结果直接回复文本，省去模板与图片渲染
+            if not flash_notes and not todo_notes:
+                return event.plain_result("未找到相关内容")
+            
+            if self.plugin.enable_rich_display:
+                html = self.template_renderer.render('search_results', {
                     'keyword': keyword,
-                    'flash_notes': flash_notes[:10],
-                    'todo_notes': todo_notes[:10]
+                    'flash_notes': _with_preview(flash_notes[:10], _SEARCH_PREVIEW_LIMIT),
+                    'todo_notes': _with_preview(todo_notes[:10], _SEARCH_PREVIEW_LIMIT)
                 })
                 image_url = await self.plugin.html_render(html)
                 return event.image_result(image_url)
             else:
-                result = f"🔍 搜索结果 - \"{keyword}\"\n\n"
+                parts = [f"🔍 搜索结果 - \"{keyword}\"\n\n"]
                 if flash_notes:
-                    result += "⚡ 闪念:\n"
-                    for note in flash_notes[:5]:
-                        content = note.get("content", "")[:50]
-                        result += f"- {content}...\n"
-                    result += "\n"
+                    parts.append("⚡ 闪念:\n")
+                    parts.extend(f"- {note.get('content', '')[:50]}...\n" for note in flash_notes[:5])
+                    parts.append("\n")
                 
                 if todo_notes:
-                    result += "📝 ToDo:\n"
-                    for note in todo_notes[:5]:
-                        content = note.get("content", "")[:50]
-                        result += f"- {content}...\n"
+                    parts.append("📝 ToDo:\n")
+                    parts.extend(f"- {note.get('content', '')[:50]}...\n" for note in todo_notes[:5])
                 
-                return event.plain_result(result or "未找到相关内容")
+                return event.plain_result("".join(parts))
         
         except Exception as e:
             logger.error(f"Search command error: {e}")
@@ -409,19 +479,37 @@ class TagsCommandHandler(ICommandHandler):
     """'#tags' 或 '#cats' 命令的具体处理器"""
     
     def __init__(self, plugin):
-        self.plugin = plugin
+        super().__init__(plugin)
+        # 最近一次渲染结果缓存：标签列表摘要、图片地址、渲染时间与对应的笔记缓存代数
+        self._cache_key = None
+        self._cache_url = None
+        self._cache_ts = 0.0
+        self._cache_generation = -1
     
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 tags 命令"""
         try:
-            tags = await self.plugin.api_client.list_tags()
+            # 缓存未过期且笔记未变更时直接复用，连标签查询也一并跳过
+            generation = self.api_client.generation
+            if (self.plugin.enable_rich_display and self._cache_url is not None
+                    and generation == self._cache_generation
+                    and time.monotonic() - self._cache_ts < _TAGS_RENDER_TTL):
+                return event.image_result(self._cache_url)
             
-            if self.plugin.config.get("enable_rich_display", True):
-                html = await self.plugin.template_renderer.render('tags_list', {
-                    'tags': tags
-                })
-                image_url = await self.plugin.html_render(html)
-                return event.image_result(image_url)
+            tags = await self.api_client.list_tags()
+            
+            if self.plugin.enable_rich_display:
+                # 缓存过期但标签未变化时，仍可跳过模板与图片渲染
+                key = hash(tuple((t.get("name", ""), t.get("count", 0)) for t in tags))
+                if key != self._cache_key or self._cache_url is None:
+                    html = self.template_renderer.render('tags_list', {
+                        'tags': tags
+                    })
+                    self._cache_url = await self.plugin.html_render(html)
+                    self._cache_key = key
+                self._cache_ts = time.monotonic()
+                self._cache_generation = generation
+                return event.image_result(self._cache_url)
             else:
                 result_text = "🏷️ 标签统计\n\n"
                 for tag in tags:
@@ -437,38 +525,20 @@ class HelpCommandHandler(ICommandHandler):
     """'#help' 命令的具体处理器"""
     
     def __init__(self, plugin):
-        self.plugin = plugin
+        super().__init__(plugin)
+        self._help_image_url = None
     
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 help 命令"""
         try:
-            if self.plugin.config.get("enable_rich_display", True):
-                html = await self.plugin.template_renderer.render('help', {})
-                image_url = await self.plugin.html_render(html, {})
-                return event.image_result(image_url)
+            if self.plugin.enable_rich_display:
+                # 帮助内容是静态的，只需渲染一次
+                if self._help_image_url is None:
+                    html = self.template_renderer.render('help', {})
+                    self._help_image_url = await self.plugin.html_render(html, {})
+                return event.image_result(self._help_image_url)
             else:
-                help_text = """📖 FJNote 助手使用指南
-
-⚡ 闪念记录:
-- 直接发送消息即可开始记录闪念
-- 30秒内的连续消息会合并为一条闪念
-- 使用 #标签 为闪念添加标签
-
-📝 ToDo 管理:
-- #todo 任务内容 #分类 ~截止日期 - 添加待办
-- #list [分类] - 查看待办列表
-- #done 编号1 编号2... - 完成待办
-- #del/#rm 编号1 编号2... - 删除待办
-- #edit 编号 新内容 - 编辑待办
-
-🔍 搜索与管理:
-- #find/#search 关键词 - 全局搜索
-- #tags/#cats - 查看所有标签
-
-💡 使用技巧:
-- 支持发送图片和文件，会自动上传到Blinko
-- 日期格式: 2024-01-01, 明天, 下周一等"""
-                return event.plain_result(help_text)
+                return event.plain_result(_HELP_TEXT)
         
         except Exception as e:
             logger.error(f"Help command error: {e}")
@@ -478,9 +548,6 @@ class HelpCommandHandler(ICommandHandler):
 class NoteCommandHandler(ICommandHandler):
     """'#note' 命令的具体处理器"""
     
-    def __init__(self, plugin):
-        self.plugin = plugin
-    
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 note 命令"""
         if not args:
@@ -488,25 +555,24 @@ class NoteCommandHandler(ICommandHandler):
         
         try:
             content = " ".join(args)
-            tags = self.plugin.session_manager.extract_tags(content)
-            clean_content = self.plugin.session_manager.remove_tags(content)
+            clean_content, tags = self.session_manager.split_content_and_tags(content)
             
             if not clean_content.strip():
                 return event.plain_result("笔记内容不能为空")
             
             # 创建标准笔记
-            success = await self.plugin.note_strategy.create(clean_content, tags, dict(self.plugin.config))
+            success = await self.note_strategy.create(clean_content, tags, self.plugin.config_snapshot)
             
             if success:
                 # 使用响应管理器
                 category = tags[0] if tags else None
-                response = self.plugin.response_manager.note_created(clean_content, category)
+                response = self.response_manager.note_created(clean_content, category)
                 if response:
                     return event.plain_result(response)
                 else:
                     return None  # 不响应
             else:
-                error_response = self.plugin.response_manager.error_general("保存笔记失败，请检查Blinko连接")
+                error_response = self.response_manager.error_general("保存笔记失败，请检查Blinko连接")
                 if error_response:
                     return event.plain_result(error_response)
                 else:
@@ -514,7 +580,7 @@ class NoteCommandHandler(ICommandHandler):
                 
         except Exception as e:
             logger.error(f"Note command error: {e}")
-            error_response = self.plugin.response_manager.error_general("保存笔记失败")
+            error_response = self.response_manager.error_general("保存笔记失败")
             if error_response:
                 return event.plain_result(error_response)
             else:
@@ -524,46 +590,45 @@ class NoteCommandHandler(ICommandHandler):
 class NotesCommandHandler(ICommandHandler):
     """'#notes' 命令的具体处理器"""
     
-    def __init__(self, plugin):
-        self.plugin = plugin
-    
     async def handle(self, event: AstrMessageEvent, args: List[str]) -> MessageEventResult:
         """处理 notes 命令"""
         category = args[0] if args else None
         
         try:
             # 获取用户配置
-            page_size = self.plugin.config.get("ui_preferences", {}).get("list_page_size", 10)
-            show_timestamps = self.plugin.config.get("ui_preferences", {}).get("show_timestamps", True)
-            compact_mode = self.plugin.config.get("ui_preferences", {}).get("compact_mode", False)
+            ui = self.plugin.ui_preferences
+            page_size = ui.get("list_page_size", 10)
+            show_timestamps = ui.get("show_timestamps", True)
+            compact_mode = ui.get("compact_mode", False)
             
-            notes = await self.plugin.api_client.list_notes(note_type=1, size=page_size * 2)  # NoteType.NOTE = 1
+            notes = await self.api_client.list_notes(note_type=1, size=page_size * 2)  # NoteType.NOTE = 1
             
-            notes_by_category = {}
+            notes_by_category = defaultdict(list)
             for i, note in enumerate(notes, 1):
                 content = note.get("content", "")
                 # 使用 blinko 的标签
-                note_tags = note.get("tags", [])
-                note_category = note_tags[0].get("tag", {}).get("name", "默认") if note_tags else "默认"
+                # 每条笔记只解析一次标签名，分类取第一个标签
+                tag_names = [tag["tag"].get("name", "") if "tag" in tag else "" for tag in note.get("tags", ())]
+                note_category = tag_names[0] if tag_names and tag_names[0] else "默认"
                 
                 if category and category != note_category:
                     continue
                 
-                if note_category not in notes_by_category:
-                    notes_by_category[note_category] = []
-                
-                note_item = {
+                notes_by_category[note_category].append({
                     "id": i,
                     "content": content,
+                    "display_content": _preview(content, _NOTE_PREVIEW_LIMIT),
                     "category": note_category,
-                    "tags": [tag.get("tag", {}).get("name", "") for tag in note_tags],
+                    "tags": tag_names,
                     "created_at": note.get("createdAt", "")
-                }
-                
-                notes_by_category[note_category].append(note_item)
+                })
+            
+            # 空结果直接回复文本，省去模板与图片渲染
+            if not notes_by_category:
+                return event.plain_result("暂无笔记")
             
-            if self.plugin.config.get("enable_rich_display", True):
-                html = await self.plugin.template_renderer.render('note_list', {
+            if self.plugin.enable_rich_display:
+                html = self.template_renderer.render('note_list', {
                     'notes': notes_by_category,
                     'category': category,
                     'show_timestamps': show_timestamps,
@@ -572,21 +637,20 @@ class NotesCommandHandler(ICommandHandler):
                 image_url = await self.plugin.html_render(html, {})
                 return event.image_result(image_url)
             else:
-                text_result = f"📝 笔记列表{f' - {category}' if category else ''}\n"
+                parts = [f"📝 笔记列表{f' - {category}' if category else ''}\n"]
                 for cat, items in notes_by_category.items():
                     if cat:
-                        text_result += f"\n【{cat}】\n"
+                        parts.append(f"\n【{cat}】\n")
                     for note in items[:page_size]:  # 限制显示数量
                         if compact_mode:
-                            text_result += f"[{note['id']}] {note['content'][:50]}{'...' if len(note['content']) > 50 else ''}\n"
+                            content = note['content']
+                            ellipsis = '...' if len(content) > 50 else ''
+                            parts.append(f"[{note['id']}] {content[:50]}{ellipsis}\n")
                         else:
-                            text_result += f"[{note['id']}] {note['content']}"
-                            if show_timestamps and note.get('created_at'):
-                                text_result += f" ({note['created_at']})"
-                            if note['tags']:
-                                text_result += f" #{' #'.join(note['tags'])}"
-                            text_result += "\n"
-                return event.plain_result(text_result or "暂无笔记")
+                            timestamp = f" ({note['created_at']})" if show_timestamps and note.get('created_at') else ""
+                            tags = f" #{' #'.join(note['tags'])}" if note['tags'] else ""
+                            parts.append(f"[{note['id']}] {note['content']}{timestamp}{tags}\n")
+                return event.plain_result("".join(parts))
         
         except Exception as e:
             logger.error(f"Notes command error: {e}")
@@ -12,6 +12,10 @@ from ..utils.file_uploader import FileUploader
 from ..utils.response_manager import ResponseManager
 from astrbot.api import logger
 
+# 闪念文本中的 #标签
+_TAG_RE = re.compile(r'#([^\s#]+)')
+
+
 class FlashSessionHandler(ISessionObserver):
     """
     闪念会话处理器
@@ -55,30 +59,37 @@ class FlashSessionHandler(ISessionObserver):
         try:
             content_parts = []
             all_tags = set()
+            media_slots = []  # (在 content_parts 中的位置, 多媒体消息)
 
             for msg in session.messages:
                 if msg.get("type") == "text":
                     content = msg.get("content", "")
                     content_parts.append(content)
                     # 从文本内容中提取标签
-                    all_tags.update(re.findall(r'#([^\s#]+)', content))
+                    all_tags.update(match.group(1) for match in _TAG_RE.finditer(content))
                 elif msg.get("type") in ["image", "file"]:
-                    # 上传文件并获取 Markdown 链接
-                    markdown_link = await self.file_uploader.upload_and_get_markdown_link(msg)
-                    content_parts.append(markdown_link)
+                    # 先占位，稍后并发上传并按原顺序回填 Markdown 链接
+                    media_slots.append((len(content_parts), msg))
+                    content_parts.append("")
+
+            if media_slots:
+                links = await self.file_uploader.upload_many([msg for _, msg in media_slots])
+                for (position, _), markdown_link in zip(media_slots, links):
+                    content_parts[position] = markdown_link
 
             final_content = "\n".join(content_parts)
+            tags = list(all_tags)
 
             # 调用策略创建笔记，标签处理已在策略内部完成
-            success = await self.flash_strategy.create(final_content, list(all_tags), self.config)
+            success = await self.flash_strategy.create(final_content, tags, self.config)
 
             if success:
                 # 使用响应管理器生成成功消息
-                response = self.response_manager.flash_saved(list(all_tags))
+                response = self.response_manager.flash_saved(tags)
                 if response:
-                    logger.info(f"用户 {session.user_id} 的闪念已保存，响应: {response}")
+                    logger.info("用户 %s 的闪念已保存，响应: %s", session.user_id, response)
                 else:
-                    logger.info(f"用户 {session.user_id} 的闪念已保存 (无响应配置)")
+                    logger.info("用户 %s 的闪念已保存 (无响应配置)", session.user_id)
             else:
                 logger.error(f"未能为用户 {session.user_id} 保存闪念")
 
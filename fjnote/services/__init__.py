@@ -2,6 +2,6 @@
 Services package
 """
 
-from .blinko_api import IBlinkoRepository, BlinkoApiClient
+from .blinko_api import IBlinkoRepository, BlinkoApiClient, BlinkoHttpxClient, get_client, release_client
 
-__all__ = ['IBlinkoRepository', 'BlinkoApiClient']
\ No newline at end of file
+__all__ = ['IBlinkoRepository', 'BlinkoApiClient', 'BlinkoHttpxClient', 'get_client', 'release_client']
\ No newline at end of file
@@ -3,15 +3,69 @@ Blinko API Service Layer - Blinko API 服务层
 本模块采用仓储模式（Repository Pattern）封装了对 Blinko API 的所有网络请求。
 - IBlinkoRepository: 定义了与笔记数据交互的统一接口。
 - BlinkoApiClient: 实现了该接口，负责具体的 HTTP 请求和响应处理。
+- BlinkoHttpxClient: 可选的 HTTP/2 传输实现，需要安装 httpx[http2]。
 这种设计将数据访问逻辑与业务逻辑解耦，使得上层代码不关心数据来源是网络 API 还是数据库。
 """
 
+import asyncio
+import json
+import tempfile
+import time
 import aiohttp
-from typing import Dict, List, Any, Optional
+from yarl import URL
+from itertools import islice
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator, Mapping, Union, IO
 from abc import ABC, abstractmethod
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+try:
+    import httpx
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+except ImportError:  # httpx[http2] 为可选依赖，缺失时只能使用 aiohttp 客户端
+    httpx = None
+
 from ..core.models import NoteType
-from ..core.exceptions import BlinkoApiException
+from ..core.exceptions import BlinkoApiException, BlinkoTransientException
+
+# list_notes 结果的缓存有效期（秒），用于合并 #list / #done / #del 等连续命令的重复查询
+_LIST_CACHE_TTL = 5.0
+
+# JSON 编解码：优先使用 orjson（直接解析 bytes，速度更快）
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = lambda obj: orjson.dumps(obj).decode()
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# 连接池设置：每个主机的最大连接数、DNS 缓存时间与 keep-alive 保持时间（秒）
+_CONNECTOR_LIMIT_PER_HOST = 64
+_DNS_CACHE_TTL = 300
+_KEEPALIVE_TIMEOUT = 75
+
+# 请求超时（秒）：总时长默认值（可由 advanced_settings.api_timeout 覆盖）与建立连接的上限，避免请求无限挂起
+_DEFAULT_REQUEST_TIMEOUT = 30
+_CONNECT_TIMEOUT = 5
+
+# HTTP/2 客户端的连接池上限，多路复用下少量连接即可承载大量并发请求
+_HTTP2_MAX_CONNECTIONS = 100
+_HTTP2_MAX_KEEPALIVE = 20
+
+# HTTP/2 客户端缓冲上传文件时保留在内存中的最大字节数，超出部分写入磁盘
+_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+# list_tags 结果的缓存有效期（秒），标签集合很少变化
+_TAGS_CACHE_TTL = 30.0
+
+# list_notes 在客户端过滤时最多拉取的页数
+_LIST_MAX_PAGES = 5
+
+# Blinko /v1/note/list 接口支持服务端过滤的笔记类型
+_SERVER_FILTERABLE_TYPES = (NoteType.FLASH.value, NoteType.NOTE.value)
 
 
 class IBlinkoRepository(ABC):
@@ -20,6 +74,17 @@ class IBlinkoRepository(ABC):
     定义了所有与 Blinko 笔记服务交互的标准操作。
     """
     
+    __slots__ = ()
+    
+    @property
+    @abstractmethod
+    def generation(self) -> int:
+        """
+        笔记数据的版本号，笔记被创建、修改或删除后递增。
+        调用方可据此判断基于笔记数据生成的结果是否已经过期。
+        """
+        pass
+    
     @abstractmethod
     async def create_note(self, content: str, note_type: int = 0, tags: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -65,6 +130,16 @@ class IBlinkoRepository(ABC):
         """删除笔记"""
         pass
     
+    @abstractmethod
+    async def archive_notes(self, note_ids: List[int]) -> Dict[str, Any]:
+        """批量归档笔记，一次请求完成"""
+        pass
+    
+    @abstractmethod
+    async def delete_notes(self, note_ids: List[int]) -> Dict[str, Any]:
+        """批量删除笔记，一次请求完成"""
+        pass
+    
     @abstractmethod
     async def search_notes(self, query: str) -> Dict[str, Any]:
         """搜索笔记"""
@@ -79,6 +154,12 @@ class IBlinkoRepository(ABC):
     async def upload_file(self, file_data: bytes, filename: str) -> Dict[str, Any]:
         """上传文件"""
         pass
+    
+    @abstractmethod
+    async def upload_file_stream(self, reader: AsyncIterator[bytes], filename: str,
+                                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """以流的方式上传文件"""
+        pass
 
 
 class BlinkoApiClient(IBlinkoRepository):
@@ -87,51 +168,128 @@ class BlinkoApiClient(IBlinkoRepository):
     负责与 Blinko 后端进行实际的 HTTP 通信。
     """
     
-    def __init__(self, base_url: str, token: str):
+    __slots__ = ("base_url", "token", "session", "_list_cache", "_list_inflight",
+                 "_list_generation", "_search_inflight", "_tags_cache", "_urls", "_etag_cache",
+                 "_pool_limit", "_keepalive_timeout", "_timeout")
+    
+    def __init__(self, base_url: str, token: str, pool_limit: int = _CONNECTOR_LIMIT_PER_HOST,
+                 keepalive_timeout: float = _KEEPALIVE_TIMEOUT, timeout: float = _DEFAULT_REQUEST_TIMEOUT):
         """
         初始化 API 客户端。
         
         :param base_url: Blinko API 的基础 URL。
         :param token: 用于认证的 Bearer Token。
+        :param pool_limit: 连接池中每个主机的最大连接数。
+        :param keepalive_timeout: 空闲 keep-alive 连接的保持时间（秒）。
+        :param timeout: 单次 API 请求的总超时时间（秒）。
         """
         self.base_url = base_url.rstrip('/')
         self.token = token
+        self._pool_limit = pool_limit
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = timeout
         self.session: Optional[aiohttp.ClientSession] = None
+        # list_notes 短期缓存: (page, size, note_type, tag_id, archived_status) -> (时间戳, 笔记列表)
+        self._list_cache: Dict[Tuple, Tuple[float, List[Dict[str, Any]]]] = {}
+        # 进行中的列表请求: 查询键 -> Task，使并发的相同查询只发出一次请求
+        self._list_inflight: Dict[Tuple, asyncio.Task] = {}
+        # 每次失效时递增，防止失效前发起的请求把旧数据写回缓存
+        self._list_generation = 0
+        # 进行中的搜索请求: 关键词 -> Task
+        self._search_inflight: Dict[str, asyncio.Task] = {}
+        # list_tags 短期缓存: (时间戳, 响应)
+        self._tags_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        # 已解析的接口 URL: endpoint -> URL，避免每次请求重新拼接和解析
+        self._urls: Dict[str, URL] = {}
+        # GET 响应的条件请求缓存: endpoint -> (ETag, 解析后的响应)
+        self._etag_cache: Dict[str, Tuple[str, Any]] = {}
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """
         获取 aiohttp.ClientSession 实例。
         采用延迟初始化（Lazy Initialization）和单例模式，确保只在需要时创建一个共享的会话。
+        会话在事件循环中首次请求时创建，并使用调优过的连接池以复用 keep-alive 连接。
         """
         if self.session is None or self.session.closed:
+            # 不设置会话级 Content-Type：json= 请求由 aiohttp 自动标为 application/json，
+            # 文件上传则需要 multipart 自带的 boundary
             headers = {
-                'Authorization': f'Bearer {self.token}',
-                'Content-Type': 'application/json'
+                'Authorization': f'Bearer {self.token}'
             }
-            self.session = aiohttp.ClientSession(headers=headers)
+            connector = aiohttp.TCPConnector(
+                limit=0,  # 不限制总连接数，仅按主机限制
+                limit_per_host=self._pool_limit,
+                ttl_dns_cache=_DNS_CACHE_TTL,
+                keepalive_timeout=self._keepalive_timeout,
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(headers=headers, connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(
+                                                     total=self._timeout,
+                                                     connect=min(_CONNECT_TIMEOUT, self._timeout)),
+                                                 json_serialize=_json_dumps)
         return self.session
     
+    def _url(self, endpoint: str) -> URL:
+        """返回接口的完整 URL，首次使用时构建并缓存。"""
+        url = self._urls.get(endpoint)
+        if url is None:
+            url = self._urls[endpoint] = URL(f"{self.base_url}/api{endpoint}")
+        return url
+    
     async def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """
         统一的请求方法，封装了请求的发送、错误处理和响应解析。
         
         :param method: HTTP 请求方法 (e.g., "GET", "POST").
         :param endpoint: API 的端点路径 (e.g., "/v1/note/list").
-        :param kwargs: 传递给 aiohttp.ClientSession.request 的其他参数。
+        :param kwargs: 传递给 _send 的其他参数（如 json、headers、params）。
         :return: 解析后的 JSON 响应字典。
-        :raises BlinkoApiException: 当网络错误或 API 返回错误状态码时抛出。
+        :raises BlinkoTransientException: 网络错误或服务端返回 5xx 时抛出，可以安全重试。
+        :raises BlinkoApiException: 超时、其他错误状态码或响应无法解析时抛出。
         """
-        session = await self._get_session()
-        url = f"{self.base_url}/api{endpoint}"
+        # 不带查询参数的 GET 请求使用 ETag 做条件请求，未变化时服务端返回 304 且无响应体
+        cacheable = method == "GET" and "params" not in kwargs
+        cached = self._etag_cache.get(endpoint) if cacheable else None
+        if cached is not None:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "If-None-Match": cached[0]}
         
+        status, headers, body = await self._send(method, endpoint, **kwargs)
+        if status == 304 and cached is not None:
+            return cached[1]
+        if status >= 400:
+            text = body.decode(errors="replace")
+            exc_type = BlinkoTransientException if status >= 500 else BlinkoApiException
+            raise exc_type(f"API request failed: {status} - {text}")
         try:
-            async with session.request(method, url, **kwargs) as response:
-                if response.status >= 400:
-                    text = await response.text()
-                    raise BlinkoApiException(f"API request failed: {response.status} - {text}")
-                return await response.json()
+            result = _json_loads(body) if body.strip() else None
+        except ValueError as e:
+            raise BlinkoApiException(f"Invalid JSON response: {str(e)}")
+        if cacheable:
+            etag = headers.get("ETag")
+            if etag:
+                self._etag_cache[endpoint] = (etag, result)
+            else:
+                self._etag_cache.pop(endpoint, None)
+        return result
+    
+    async def _send(self, method: str, endpoint: str, **kwargs) -> Tuple[int, Mapping[str, str], bytes]:
+        """
+        发送 HTTP 请求并读取完整响应；子类可覆盖此方法以替换底层 HTTP 库。
+        
+        :return: (状态码, 响应头, 响应体) 元组。
+        :raises BlinkoTransientException: 网络错误时抛出。
+        :raises BlinkoApiException: 超时时抛出；请求可能已被服务端处理，重试非幂等请求会产生重复数据，因此不视为瞬时故障。
+        """
+        session = await self._get_session()
+        try:
+            async with session.request(method, self._url(endpoint), **kwargs) as response:
+                return response.status, response.headers, await response.read()
+        except asyncio.TimeoutError:
+            # aiohttp 的 ServerTimeoutError 同时是 ClientError，须先于 ClientError 捕获
+            raise BlinkoApiException(f"Request timed out: {method} {endpoint}")
         except aiohttp.ClientError as e:
-            raise BlinkoApiException(f"Network error: {str(e)}")
+            raise BlinkoTransientException(f"Network error: {str(e)}")
     
     async def create_note(self, content: str, note_type: int = 0, tags: Optional[List[str]] = None) -> Dict[str, Any]:
         """创建笔记"""
@@ -140,36 +298,90 @@ class BlinkoApiClient(IBlinkoRepository):
             "type": note_type
         }
         # 不传递tags数组，让Blinko从content中自动解析标签
+        self.invalidate_notes_cache()
         return await self._request("POST", "/v1/note/upsert", json=data)
     
     async def list_notes(self, page: int = 1, size: int = 30, note_type: int = -1, tag_id: Optional[int] = None, archived_status: Optional[bool] = None) -> List[Dict[str, Any]]:
-        """获取笔记列表"""
+        """获取笔记列表，短时间内的相同查询直接复用缓存结果"""
+        cache_key = (page, size, note_type, tag_id, archived_status)
+        cached = self._list_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < _LIST_CACHE_TTL:
+            return list(cached[1])
+        
+        task = self._list_inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache_notes(cache_key))
+            self._list_inflight[cache_key] = task
+            
+            def _forget(done: asyncio.Task) -> None:
+                # 失效后同一查询可能已换成新的请求，只移除自己
+                if self._list_inflight.get(cache_key) is done:
+                    del self._list_inflight[cache_key]
+            
+            task.add_done_callback(_forget)
+        # shield: 单个调用方被取消时不影响共享同一请求的其他调用方
+        return list(await asyncio.shield(task))
+    
+    async def _fetch_and_cache_notes(self, cache_key: Tuple) -> List[Dict[str, Any]]:
+        """拉取笔记列表，请求期间缓存未失效时写入缓存"""
+        generation = self._list_generation
+        notes = await self._fetch_notes(*cache_key)
+        if generation == self._list_generation:
+            self._list_cache[cache_key] = (time.monotonic(), notes)
+        return notes
+    
+    @property
+    def generation(self) -> int:
+        """笔记数据的版本号，每次 invalidate_notes_cache 时递增"""
+        return self._list_generation
+    
+    def invalidate_notes_cache(self):
+        """使 list_notes 与 list_tags 缓存失效，在笔记被创建、修改或删除后调用。"""
+        self._list_generation += 1
+        self._list_cache.clear()
+        # 失效前发起的请求可能返回旧数据，之后的查询不再加入这些请求
+        self._list_inflight.clear()
+        # 标签由笔记内容解析而来，笔记变更后标签集合也可能变化
+        self._tags_cache = None
+    
+    async def _fetch_notes(self, page: int, size: int, note_type: int, tag_id: Optional[int], archived_status: Optional[bool]) -> List[Dict[str, Any]]:
+        """
+        从 Blinko 拉取笔记列表。
+        尽量把过滤条件交给服务端；服务端无法过滤的条件（如 ToDo 类型）在客户端过滤，
+        并逐页拉取直到凑够 size 条、数据取完或达到页数上限。
+        """
         data = {
             "page": page,
-            "size": size * 5,  # 获取更多记录(e.g. 150)以便在客户端进行更可靠的过滤
+            "size": size,
             "tagId": tag_id,
             "orderBy": "desc"
         }
-        # 注意：blinko API 的 type 过滤似乎不工作，所以我们在客户端过滤
-        
-        result = await self._request("POST", "/v1/note/list", json=data)
-        
-        # 如果API返回的是直接的数组
-        if isinstance(result, list):
-            notes = result
-        else:
-            notes = result.get("notes", [])
-        
-        # 客户端过滤类型
-        if note_type != -1:
-            notes = [note for note in notes if note.get("type") == note_type]
-        
-        # 新增: 按归档状态过滤
+        # 注意：blinko API 的 type 过滤只接受 0/1，其他类型只能在客户端过滤
+        if note_type in _SERVER_FILTERABLE_TYPES:
+            data["type"] = note_type
         if archived_status is not None:
-            notes = [note for note in notes if note.get("isArchived") == archived_status]
+            data["isArchived"] = archived_status
+        
+        collected: List[Dict[str, Any]] = []
+        for _ in range(_LIST_MAX_PAGES):
+            result = await self._request("POST", "/v1/note/list", json=data)
+            
+            # 如果API返回的是直接的数组
+            batch = result if isinstance(result, list) else result.get("notes", [])
+            
+            # 客户端再过滤一次类型与归档状态，以防服务端忽略了过滤条件；凑够 size 条即停止过滤
+            collected.extend(islice(
+                (note for note in batch
+                 if (note_type == -1 or note.get("type") == note_type)
+                 and (archived_status is None or note.get("isArchived") == archived_status)),
+                size - len(collected)
+            ))
+            
+            if len(collected) >= size or len(batch) < size:
+                break
+            data["page"] += 1
         
-        # 限制返回数量
-        return notes[:size]
+        return collected
     
     async def update_note(self, note_id: int, content: Optional[str] = None, note_type: Optional[int] = None, tags: Optional[List[str]] = None, is_archived: Optional[bool] = None) -> Dict[str, Any]:
         """更新笔记，支持部分更新"""
@@ -183,15 +395,37 @@ class BlinkoApiClient(IBlinkoRepository):
         if is_archived is not None:
             data["isArchived"] = is_archived
         
+        self.invalidate_notes_cache()
         return await self._request("POST", "/v1/note/upsert", json=data)
     
     async def delete_note(self, note_id: int) -> Dict[str, Any]:
         """删除笔记"""
-        data = {"noteIds": [note_id]}
+        return await self.delete_notes([note_id])
+    
+    async def archive_notes(self, note_ids: List[int]) -> Dict[str, Any]:
+        """批量归档笔记"""
+        data = {"ids": note_ids, "isArchived": True}
+        self.invalidate_notes_cache()
+        return await self._request("POST", "/v1/note/batch-update", json=data)
+    
+    async def delete_notes(self, note_ids: List[int]) -> Dict[str, Any]:
+        """批量删除笔记"""
+        data = {"ids": note_ids}
+        self.invalidate_notes_cache()
         return await self._request("POST", "/v1/note/batch-delete", json=data)
     
     async def search_notes(self, query: str) -> List[Dict[str, Any]]:
-        """搜索笔记"""
+        """搜索笔记，同一关键词的并发搜索（如闪念与待办策略同时搜索）共享一次请求"""
+        task = self._search_inflight.get(query)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_search(query))
+            self._search_inflight[query] = task
+            task.add_done_callback(lambda _: self._search_inflight.pop(query, None))
+        # shield: 单个调用方被取消时不影响共享同一请求的其他调用方
+        return list(await asyncio.shield(task))
+    
+    async def _fetch_search(self, query: str) -> List[Dict[str, Any]]:
+        """向 Blinko 发起搜索请求"""
         data = {
             "page": 1,
             "size": 9999,
@@ -207,13 +441,23 @@ class BlinkoApiClient(IBlinkoRepository):
             return result.get("notes", [])
     
     async def list_tags(self) -> Dict[str, Any]:
-        """获取标签列表"""
-        return await self._request("GET", "/v1/tags/list")
+        """获取标签列表，结果在 _TAGS_CACHE_TTL 秒内复用"""
+        now = time.monotonic()
+        cached = self._tags_cache
+        if cached is not None and now - cached[0] < _TAGS_CACHE_TTL:
+            return cached[1]
+        
+        generation = self._list_generation
+        tags = await self._request("GET", "/v1/tags/list")
+        # 请求期间若有笔记变更，则不缓存可能过期的结果
+        if generation == self._list_generation:
+            self._tags_cache = (now, tags)
+        return tags
     
     async def upload_file(self, file_data: bytes, filename: str) -> Dict[str, Any]:
         """上传文件"""
         session = await self._get_session()
-        url = f"{self.base_url}/api/v1/file/upload"
+        url = self._url("/v1/file/upload")
         
         data = aiohttp.FormData()
         data.add_field('file', file_data, filename=filename)
@@ -224,7 +468,164 @@ class BlinkoApiClient(IBlinkoRepository):
                 raise BlinkoApiException(f"File upload failed: {response.status} - {text}")
             return await response.json()
     
+    async def upload_file_stream(self, reader: AsyncIterator[bytes], filename: str,
+                                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        以流的方式上传文件，数据块边产生边写入套接字，无需把整个文件读入内存。
+        multipart 请求体总长度未知，aiohttp 会自动使用分块传输编码。
+        
+        :param reader: 逐块产出文件内容的异步迭代器。
+        :param filename: 文件名。
+        :param timeout: 本次上传的总超时时间（秒）；上传与数据源下载同步进行，
+                        耗时取决于文件大小，不受普通 API 请求超时限制。None 表示沿用会话的超时设置。
+        :return: API 响应字典。
+        """
+        session = await self._get_session()
+        url = self._url("/v1/file/upload")
+        
+        data = aiohttp.FormData()
+        data.add_field('file', reader, filename=filename, content_type='application/octet-stream')
+        
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout, connect=min(_CONNECT_TIMEOUT, timeout))
+        async with session.post(url, data=data, **kwargs) as response:
+            if response.status >= 400:
+                text = await response.text()
+                raise BlinkoApiException(f"File upload failed: {response.status} - {text}")
+            return await response.json()
+    
+    async def warm_up(self):
+        """提前建立到 Blinko 的连接（DNS/TCP/TLS）以便后续请求复用；只发送 HEAD，不读写数据，失败时忽略"""
+        try:
+            await self._send("HEAD", "/")
+        except BlinkoApiException:
+            pass
+    
     async def close(self):
         """关闭连接"""
         if self.session and not self.session.closed:
-            await self.session.close()
\ No newline at end of file
+            await self.session.close()
+
+
+
+class BlinkoHttpxClient(BlinkoApiClient):
+    """
+    基于 httpx 的 Blinko API 客户端（HTTP/2）
+    复用 BlinkoApiClient 的全部缓存与业务逻辑，仅替换底层传输：
+    并发请求在同一个 TLS 连接上多路复用，减少握手与连接数量。
+    """
+    
+    __slots__ = ("_client",)
+    
+    def __init__(self, base_url: str, token: str, pool_limit: int = _CONNECTOR_LIMIT_PER_HOST,
+                 keepalive_timeout: float = _KEEPALIVE_TIMEOUT, timeout: float = _DEFAULT_REQUEST_TIMEOUT):
+        super().__init__(base_url, token, pool_limit, keepalive_timeout, timeout)
+        self._client: Optional["httpx.AsyncClient"] = None
+    
+    def _get_client(self) -> "httpx.AsyncClient":
+        """延迟创建共享的 httpx.AsyncClient。"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                headers={'Authorization': f'Bearer {self.token}'},
+                limits=httpx.Limits(max_connections=_HTTP2_MAX_CONNECTIONS,
+                                    max_keepalive_connections=_HTTP2_MAX_KEEPALIVE,
+                                    keepalive_expiry=self._keepalive_timeout),
+                timeout=httpx.Timeout(self._timeout, connect=min(_CONNECT_TIMEOUT, self._timeout))
+            )
+        return self._client
+    
+    async def _send(self, method: str, endpoint: str, **kwargs) -> Tuple[int, Mapping[str, str], bytes]:
+        """通过 httpx 发送请求，JSON 请求体同样使用 _json_dumps 编码。"""
+        if "json" in kwargs:
+            kwargs["content"] = _json_dumps(kwargs.pop("json"))
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+        try:
+            response = await self._get_client().request(method, str(self._url(endpoint)), **kwargs)
+        except httpx.TimeoutException:
+            raise BlinkoApiException(f"Request timed out: {method} {endpoint}")
+        except httpx.HTTPError as e:
+            raise BlinkoTransientException(f"Network error: {str(e)}")
+        return response.status_code, response.headers, response.content
+    
+    async def _upload(self, file_data: Union[bytes, IO[bytes]], filename: str,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """以 multipart 表单上传文件内容（bytes 或已定位到开头的文件对象），timeout 为 None 时沿用客户端超时。"""
+        files = {'file': (filename, file_data, 'application/octet-stream')}
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=min(_CONNECT_TIMEOUT, timeout))
+        status, _, body = await self._send("POST", "/v1/file/upload", files=files, **kwargs)
+        if status >= 400:
+            raise BlinkoApiException(f"File upload failed: {status} - {body.decode(errors='replace')}")
+        return _json_loads(body)
+    
+    async def upload_file(self, file_data: bytes, filename: str) -> Dict[str, Any]:
+        """上传文件"""
+        return await self._upload(file_data, filename)
+    
+    async def upload_file_stream(self, reader: AsyncIterator[bytes], filename: str,
+                                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        上传文件。httpx 的 multipart 编码不支持异步数据源，
+        因此先把数据块写入临时文件：小文件留在内存中，大文件溢出到磁盘。
+        """
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY) as spool:
+            async for chunk in reader:
+                spool.write(chunk)
+            spool.seek(0)
+            return await self._upload(spool, filename, timeout)
+    
+    async def close(self):
+        """关闭连接"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+# 进程内共享的 API 客户端: 参数元组 -> [客户端, 引用计数]，最后一个使用者释放时关闭并移除
+_CLIENTS: Dict[Tuple, List[Any]] = {}
+
+
+def get_client(base_url: str, token: str, http2: bool = False, pool_limit: int = _CONNECTOR_LIMIT_PER_HOST,
+               keepalive_timeout: float = _KEEPALIVE_TIMEOUT,
+               timeout: float = _DEFAULT_REQUEST_TIMEOUT) -> BlinkoApiClient:
+    """
+    获取指定参数对应的共享 API 客户端，并增加其引用计数。
+    同一 Blinko 实例在进程内只保留一个客户端，从而复用其连接池、DNS 缓存和查询缓存。
+    使用完毕后必须调用 release_client 释放。
+    
+    :param base_url: Blinko API 的基础 URL。
+    :param token: 用于认证的 Bearer Token，作为共享键的一部分。
+    :param http2: 是否使用基于 httpx 的 HTTP/2 客户端；未安装 httpx[http2] 时回退到 aiohttp。
+    :param pool_limit: 连接池中每个主机的最大连接数。
+    :param keepalive_timeout: 空闲 keep-alive 连接的保持时间（秒）。
+    :param timeout: 单次 API 请求的总超时时间（秒）。
+    :return: BlinkoApiClient 实例。
+    """
+    key = (base_url, token, http2, pool_limit, keepalive_timeout, timeout)
+    entry = _CLIENTS.get(key)
+    if entry is None:
+        if http2 and httpx is not None:
+            client = BlinkoHttpxClient(base_url, token, pool_limit, keepalive_timeout, timeout)
+        else:
+            client = BlinkoApiClient(base_url, token, pool_limit, keepalive_timeout, timeout)
+        entry = _CLIENTS[key] = [client, 0]
+    entry[1] += 1
+    return entry[0]
+
+
+async def release_client(client: BlinkoApiClient):
+    """
+    释放通过 get_client 获取的客户端；最后一个使用者释放时关闭客户端并将其移除，
+    之后相同参数的 get_client 会创建新的客户端。
+    
+    :param client: 要释放的客户端。
+    """
+    for key, entry in _CLIENTS.items():
+        if entry[0] is client:
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del _CLIENTS[key]
+            break
+    await client.close()
@@ -2,6 +2,9 @@
 Strategies package
 """
 
-from .note_strategies import INoteStrategy, FlashNoteStrategy, TodoNoteStrategy
+from .base import INoteStrategy
+from .flash_strategy import FlashNoteStrategy
+from .todo_strategy import TodoNoteStrategy
+from .note_strategy import NoteStrategy
 
-__all__ = ['INoteStrategy', 'FlashNoteStrategy', 'TodoNoteStrategy']
\ No newline at end of file
+__all__ = ['INoteStrategy', 'FlashNoteStrategy', 'TodoNoteStrategy', 'NoteStrategy']
\ No newline at end of file
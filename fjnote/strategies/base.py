@@ -3,11 +3,60 @@ Base Note Strategy - 笔记策略基类
 本模块定义了所有笔记策略的抽象基类 INoteStrategy。
 """
 
+import asyncio
+import random
 import re
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 
 from ..services.blinko_api import IBlinkoRepository
+from ..core.exceptions import BlinkoTransientException
+
+# 内容中的 #标签，分组 1 为标签名
+_TAG_RE = re.compile(r'#([^\s#]+)')
+
+# 创建笔记失败时的重试设置：最多尝试次数与指数退避的基础间隔（秒）
+_RETRY_ATTEMPTS = 3
+_RETRY_BASE_DELAY = 0.1
+
+
+async def _with_retry(fn, *args, attempts: int = _RETRY_ATTEMPTS, base: float = _RETRY_BASE_DELAY, **kwargs):
+    """
+    以带抖动的指数退避重试调用 fn，避免瞬时故障时立即重试放大服务端压力。
+    只重试瞬时故障（网络错误与 5xx）；4xx 重试无意义，超时的请求可能已被服务端保存，重试会产生重复笔记。
+    
+    :param fn: 要调用的协程函数。
+    :param attempts: 最多尝试次数。
+    :param base: 退避的基础间隔（秒），第 i 次重试前等待 base * 2**i 加少量随机抖动。
+    :return: fn 的返回值；全部失败时抛出最后一次的 BlinkoTransientException，其他异常直接抛出。
+    """
+    for i in range(attempts):
+        try:
+            return await fn(*args, **kwargs)
+        except BlinkoTransientException:
+            if i == attempts - 1:
+                raise
+            await asyncio.sleep(base * 2 ** i + random.random() * 0.05)
+
+
+def _truncate(text: str, limit: int) -> str:
+    """
+    将内容截断到 limit 个字符，末尾加 "..."。
+    如果内容以 _prepare_content_and_tags 追加的标签行结尾，则保留该行，只截断正文，
+    以免截断后 Blinko 丢失标签。
+    
+    :param text: 要截断的内容。
+    :param limit: 最大字符数，0 或负数表示不限制。
+    :return: 截断后的内容。
+    """
+    if limit <= 0 or len(text) <= limit:
+        return text
+    tag_start = text.rfind("\n\n#")
+    if tag_start != -1:
+        tail = text[tag_start:]
+        if "\n" not in tail[2:] and len(tail) <= limit // 2:
+            return text[:limit - len(tail)] + "..." + tail
+    return text[:limit] + "..."
 
 class INoteStrategy(ABC):
     """
@@ -15,6 +64,8 @@ class INoteStrategy(ABC):
     定义了所有笔记处理策略的公共行为。
     """
     
+    __slots__ = ("repository",)
+    
     def __init__(self, repository: IBlinkoRepository):
         """
         初始化策略。
@@ -33,26 +84,31 @@ class INoteStrategy(ABC):
         :param config: 插件配置字典。
         :return: 一个元组，包含处理后的内容字符串和所有标签的集合列表。
         """
-        # 1. 从内容中提取已有的标签
-        content_tags = set(re.findall(r'#([^\s#]+)', content))
+        # 1. 从内容中提取已有的标签（保持出现顺序并去重）
+        content_tags = list(dict.fromkeys(_TAG_RE.findall(content)))
+        seen = set(content_tags)
         
-        # 2. 合并所有标签源
-        all_tags = set(tags) | content_tags
+        # 2. 单次遍历收集内容中缺失的外部标签
+        missing_tags = []
+        for tag in tags:
+            if tag not in seen:
+                seen.add(tag)
+                missing_tags.append(tag)
         
         # 3. 根据策略类型添加默认分类标签
         note_type_name = self.__class__.__name__.replace("NoteStrategy", "").lower()
         default_category = config.get("default_categories", {}).get(f"{note_type_name}_category", "")
-        if default_category:
-            all_tags.add(default_category)
+        if default_category and default_category not in seen:
+            missing_tags.append(default_category)
             
         # 4. 确保所有标签都存在于内容中，以便Blinko解析
         final_content = content
-        missing_tags = all_tags - content_tags
         if missing_tags:
+            missing_tags.sort()
             # 在末尾添加缺失的标签，并确保前面有空行以符合Blinko的解析规则
-            final_content += "\n\n" + " ".join(f"#{tag}" for tag in sorted(list(missing_tags)))
+            final_content = f"{content}\n\n{' '.join('#' + tag for tag in missing_tags)}"
             
-        return final_content.strip(), list(all_tags)
+        return final_content.strip(), content_tags + missing_tags
 
     @abstractmethod
     async def create(self, content: str, tags: List[str], config: Optional[Dict] = None) -> bool:
@@ -66,6 +122,21 @@ class INoteStrategy(ABC):
         """
         pass
     
+    @staticmethod
+    def _filter_notes(notes: List[Dict[str, Any]], note_type: int, keyword: str) -> List[Dict[str, Any]]:
+        """
+        从搜索结果中筛选指定类型且内容包含关键词的笔记（不区分大小写）。
+        先比较类型再转换小写，每条笔记的内容最多只被转换一次。
+        
+        :param notes: 搜索接口返回的笔记列表。
+        :param note_type: 目标笔记类型的值。
+        :param keyword: 搜索关键词。
+        :return: 匹配的笔记列表。
+        """
+        keyword_lower = keyword.lower()
+        return [note for note in notes
+                if note.get("type") == note_type and keyword_lower in (note.get("content") or "").lower()]
+    
     @abstractmethod
     async def search(self, keyword: str) -> List[Dict[str, Any]]:
         """
@@ -3,33 +3,35 @@ Flash Note Strategy - 闪念笔记策略
 """
 from typing import List, Dict, Any, Optional
 
-from .base import INoteStrategy
+from .base import INoteStrategy, _with_retry, _truncate, _RETRY_ATTEMPTS
 from ..core.models import NoteType
 from astrbot.api import logger
 
 class FlashNoteStrategy(INoteStrategy):
     """闪念笔记的具体策略实现"""
     
+    __slots__ = ()
+    
     async def create(self, content: str, tags: List[str], config: Optional[Dict] = None) -> bool:
         """创建闪念笔记"""
         try:
             config = config or {}
             
+            advanced_settings = config.get("advanced_settings", {})
             final_content, final_tags = self._prepare_content_and_tags(content, tags, config)
             
             # 检查内容长度限制
-            max_length = config.get("advanced_settings", {}).get("max_content_length", 0)
+            max_length = advanced_settings.get("max_content_length", 0)
             if max_length > 0 and len(final_content) > max_length:
-                # 截断时要小心，不要破坏标签
-                # 简单处理：直接截断
-                final_content = final_content[:max_length] + "..."
+                final_content = _truncate(final_content, max_length)
                 logger.warning(f"Content truncated to {max_length} characters")
 
             # Blinko会从内容中解析标签，所以tags参数可以传空列表
-            await self.repository.create_note(final_content, NoteType.FLASH.value, [])
+            attempts = _RETRY_ATTEMPTS if advanced_settings.get("auto_retry_failed", True) else 1
+            await _with_retry(self.repository.create_note, final_content, NoteType.FLASH.value, [], attempts=attempts)
             
-            if config.get("advanced_settings", {}).get("enable_debug_mode", False):
-                logger.info(f"Flash note created with content: {final_content}")
+            if advanced_settings.get("enable_debug_mode", False):
+                logger.info("Flash note created with content: %s", final_content)
             
             return True
         except Exception as e:
@@ -41,10 +43,7 @@ class FlashNoteStrategy(INoteStrategy):
         try:
             all_notes = await self.repository.search_notes(keyword)
             # 过滤出闪念类型并匹配关键词
-            flash_notes = [note for note in all_notes 
-                          if note.get("type") == NoteType.FLASH.value and 
-                          keyword.lower() in note.get("content", "").lower()]
-            return flash_notes
+            return self._filter_notes(all_notes, NoteType.FLASH.value, keyword)
         except Exception as e:
             logger.error(f"Failed to search flash notes: {e}")
             return []
\ No newline at end of file
@@ -3,6 +3,7 @@ Utils package
 """
 
 from .session_manager import ISessionObserver, SessionManager
+from .recent_list_store import RecentListStore
 from .template_renderer import ITemplateRenderer, Jinja2TemplateRenderer
 
-__all__ = ['ISessionObserver', 'SessionManager', 'ITemplateRenderer', 'Jinja2TemplateRenderer']
\ No newline at end of file
+__all__ = ['ISessionObserver', 'SessionManager', 'RecentListStore', 'ITemplateRenderer', 'Jinja2TemplateRenderer']
\ No newline at end of file
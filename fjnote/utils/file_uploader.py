@@ -3,22 +3,71 @@ File Uploader Utility
 文件上传工具类，负责处理文件下载和上传到Blinko的逻辑
 """
 
+import asyncio
 import aiohttp
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 
 from ..services.blinko_api import BlinkoApiClient
 from astrbot.api import logger
 
+# 同时进行的文件下载/上传数量的默认值与上限，避免触发 Blinko 的限流
+_MAX_CONCURRENT_UPLOADS = 4
+_MAX_CONCURRENT_UPLOADS_LIMIT = 20
+
+# 流式转存时每次读取的块大小（字节）
+_CHUNK_SIZE = 64 * 1024
+
+# 下载会话的连接池设置：总连接数、每个主机的连接数与 DNS 缓存时间（秒）
+_DOWNLOAD_CONNECTOR_LIMIT = 50
+_DOWNLOAD_CONNECTOR_LIMIT_PER_HOST = 20
+_DOWNLOAD_DNS_CACHE_TTL = 300
+
+# 下载超时（秒）：总时长默认值，以及建立连接与单次读取的上限，避免慢速源长期占用并发名额
+_DOWNLOAD_TIMEOUT = 60
+_DOWNLOAD_CONNECT_TIMEOUT = 10
+_DOWNLOAD_READ_TIMEOUT = 30
+
+# 文件转存遇到连接类错误时的最多尝试次数
+_TRANSFER_RETRY_ATTEMPTS = 3
+
+
 class FileUploader:
     """文件上传器"""
 
-    def __init__(self, api_client: BlinkoApiClient):
+    def __init__(self, api_client: BlinkoApiClient, max_concurrency: int = _MAX_CONCURRENT_UPLOADS,
+                 download_timeout: float = _DOWNLOAD_TIMEOUT):
         """
         初始化文件上传器
         
         :param api_client: Blinko API 客户端实例
+        :param max_concurrency: 同时进行的上传数量，取值限制在 1 到 _MAX_CONCURRENT_UPLOADS_LIMIT 之间
+        :param download_timeout: 单个文件下载并转存的总时长上限（秒），包含失败重试
         """
         self.api_client = api_client
+        self._download_timeout = download_timeout
+        self._timeout = aiohttp.ClientTimeout(
+            total=download_timeout,
+            sock_connect=_DOWNLOAD_CONNECT_TIMEOUT,
+            sock_read=_DOWNLOAD_READ_TIMEOUT
+        )
+        self._semaphore = asyncio.Semaphore(max(1, min(max_concurrency, _MAX_CONCURRENT_UPLOADS_LIMIT)))
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """延迟创建用于下载文件的共享会话，复用 keep-alive 连接。"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=_DOWNLOAD_CONNECTOR_LIMIT,
+                limit_per_host=_DOWNLOAD_CONNECTOR_LIMIT_PER_HOST,
+                ttl_dns_cache=_DOWNLOAD_DNS_CACHE_TTL
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self._session
+
+    async def close(self):
+        """关闭下载会话"""
+        if self._session and not self._session.closed:
+            await self._session.close()
 
     async def upload_and_get_markdown_link(self, msg: Dict[str, Any]) -> str:
         """
@@ -31,18 +80,92 @@ class FileUploader:
         if not file_url:
             return ""
 
+        async with self._semaphore:
+            return await self._upload(msg, file_url)
+
+    async def upload_iter(self, msgs: List[Dict[str, Any]]) -> AsyncIterator[Tuple[int, str]]:
+        """
+        并发上传多条消息中的文件，按完成先后逐个产出结果，并发数受信号量限制。
+        
+        :param msgs: 包含文件/图片信息的消息字典列表
+        :return: 异步产出 (消息在输入中的位置, Markdown 链接) 元组，单个失败时链接为错误提示
+        """
+        async def upload_one(index: int, msg: Dict[str, Any]) -> Tuple[int, str]:
+            try:
+                return index, await self.upload_and_get_markdown_link(msg)
+            except Exception as e:
+                logger.error(f"文件上传过程中出错: {e}")
+                return index, f"[{msg.get('type', 'file')} 处理失败]"
+
+        tasks = [asyncio.ensure_future(upload_one(index, msg)) for index, msg in enumerate(msgs)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 调用方提前停止迭代时，取消尚未完成的上传
+            for task in tasks:
+                task.cancel()
+
+    async def upload_many(self, msgs: List[Dict[str, Any]]) -> List[str]:
+        """
+        并发上传多条消息中的文件，并发数受信号量限制。
+        
+        :param msgs: 包含文件/图片信息的消息字典列表
+        :return: 与输入顺序一致的 Markdown 链接列表，单个失败时对应位置为错误提示
+        """
+        links = [""] * len(msgs)
+        async for index, link in self.upload_iter(msgs):
+            links[index] = link
+        return links
+
+    async def _transfer(self, file_url: str, filename: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        下载文件并以流的方式转存到 Blinko，下载返回非 200 状态码时返回 None。
+        
+        :param timeout: 本次尝试剩余的总时长（秒），下载与转存同步进行，共用这一上限，
+                        转存不受普通 API 请求的超时限制
+        """
+        session = await self._get_session()
+        attempt_timeout = aiohttp.ClientTimeout(
+            total=timeout,
+            sock_connect=_DOWNLOAD_CONNECT_TIMEOUT,
+            sock_read=_DOWNLOAD_READ_TIMEOUT
+        )
+        async with session.get(file_url, timeout=attempt_timeout) as response:
+            if response.status != 200:
+                logger.error(f"下载文件失败 {file_url}: 状态码 {response.status}")
+                return None
+            return await self.api_client.upload_file_stream(
+                response.content.iter_chunked(_CHUNK_SIZE), filename, timeout
+            )
+
+    async def _transfer_with_retry(self, file_url: str, filename: str,
+                                   attempts: int = _TRANSFER_RETRY_ATTEMPTS) -> Optional[Dict[str, Any]]:
+        """
+        转存文件，遇到连接类错误或超时时按指数退避（1, 2, 4... 秒）重试。
+        流式上传无法重放，因此每次重试都会重新下载。HTTP 错误状态不重试。
+        所有尝试与退避等待共用 download_timeout 的总时长，剩余时间不够时不再重试。
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._download_timeout
+        for attempt in range(attempts):
+            try:
+                return await self._transfer(file_url, filename, deadline - loop.time())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                delay = 2 ** attempt
+                if attempt == attempts - 1 or deadline - loop.time() <= delay:
+                    raise
+                logger.warning(f"文件转存失败，{delay} 秒后重试 {file_url}: {e}")
+                await asyncio.sleep(delay)
+
+    async def _upload(self, msg: Dict[str, Any], file_url: str) -> str:
+        """下载并上传单个文件，调用方负责并发控制。"""
         try:
-            # 1. 从 URL 下载文件内容
-            async with aiohttp.ClientSession() as session:
-                async with session.get(file_url) as response:
-                    if response.status != 200:
-                        logger.error(f"下载文件失败 {file_url}: 状态码 {response.status}")
-                        return f"[{msg.get('type', 'file')} 下载失败]"
-                    file_data = await response.read()
-
-            # 2. 上传到 Blinko
+            # 1. 从 URL 下载文件，2. 边下载边以流的方式上传到 Blinko
             filename = msg.get("filename", "file")
-            upload_response = await self.api_client.upload_file(file_data, filename)
+            upload_response = await self._transfer_with_retry(file_url, filename)
+            if upload_response is None:
+                return f"[{msg.get('type', 'file')} 下载失败]"
             
             # 3. 解析响应并获取 URL
             # 假设响应格式为 {'url': '...'} 或 {'data': {'url': '...'}}
@@ -58,6 +181,9 @@ class FileUploader:
             else:
                 return f"[{filename}]({uploaded_url})"
 
+        except asyncio.TimeoutError:
+            logger.error(f"下载文件超时 {file_url}")
+            return f"[{msg.get('type', 'file')} 下载失败]"
         except Exception as e:
             logger.error(f"文件上传过程中出错 {file_url}: {e}")
             return f"[{msg.get('type', 'file')} 处理失败]"
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Recent List Store - 最近列表存储
+本模块记录每个用户最近一次 #list 看到的待办列表，使 #done/#del/#edit 的编号与用户所见一致。
+条目在有效期后失效，总数超过上限时淘汰最久未使用的条目，避免随用户数量无限增长。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 列表的有效期（秒），期间 #done/#del/#edit 直接按该列表解析编号
+_LIST_TTL = 300.0
+
+# 同时保存的用户列表数量上限
+_MAX_ENTRIES = 1000
+
+
+class RecentListStore:
+    """
+    用户最近查看的待办列表存储
+    保存的是笔记字典的副本，与 API 客户端缓存中的对象互不影响。
+    """
+    
+    __slots__ = ("_entries", "_ttl", "_max_entries")
+    
+    def __init__(self, ttl: float = _LIST_TTL, max_entries: int = _MAX_ENTRIES):
+        """
+        初始化列表存储。
+        
+        :param ttl: 列表的有效期（秒）。
+        :param max_entries: 同时保存的列表数量上限。
+        """
+        # user_id -> (记录时间, 笔记列表)，按最近使用排序，末尾为最近使用
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._ttl = ttl
+        self._max_entries = max_entries
+    
+    def remember(self, user_id: str, notes: List[Dict[str, Any]]):
+        """记录用户刚刚看到的待办列表，列表顺序即显示编号顺序。"""
+        now = time.monotonic()
+        self._entries[user_id] = (now, [dict(note) for note in notes])
+        self._entries.move_to_end(user_id)
+        self._evict(now)
+    
+    def get(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        """获取用户最近一次查看且仍在有效期内的待办列表，不存在或已过期时返回 None。"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self._ttl:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[1]
+    
+    def mark_archived(self, user_id: str, note_ids: Iterable[int]):
+        """将列表中指定笔记替换为已归档的副本，编号保持不变。"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        ids = set(note_ids)
+        notes = [{**note, "isArchived": True} if note.get("id") in ids else note for note in entry[1]]
+        self._entries[user_id] = (entry[0], notes)
+    
+    def forget(self, user_id: str):
+        """丢弃用户最近查看的待办列表（删除或新增待办后编号已失效），下次按编号操作时重新拉取。"""
+        self._entries.pop(user_id, None)
+    
+    def _evict(self, now: float):
+        """淘汰最久未使用的条目直到不超过上限，并顺带清理队首已过期的条目。"""
+        entries = self._entries
+        while entries:
+            oldest_ts = next(iter(entries.values()))[0]
+            if len(entries) <= self._max_entries and now - oldest_ts < self._ttl:
+                break
+            entries.popitem(last=False)
@@ -3,7 +3,58 @@ Response Manager for FJNote Plugin
 响应管理器，支持自定义响应内容和占位符替换
 """
 
-from typing import Dict, Any, Optional
+from string import Formatter
+from typing import Dict, Any, Optional, Callable
+
+_FORMATTER = Formatter()
+
+# 条目类型的中文名称
+_TYPE_NAMES = {
+    "todo": "待办",
+    "note": "笔记",
+    "flash": "闪念"
+}
+
+
+def _noop_renderer(**kwargs) -> None:
+    """未配置或为空的模板：不响应。"""
+    return None
+
+
+def _compile_template(template: str) -> Callable[..., Optional[str]]:
+    """
+    将模板预编译为渲染函数，避免每次响应都重新解析格式字符串。
+    形如 {name} 的简单占位符被预解析为 (字面文本, 占位符名) 片段并直接拼接；
+    包含格式说明、转换符、属性/索引访问或格式错误的模板交由 str.format 处理。
+    占位符替换失败时返回原始模板。
+    """
+    try:
+        parsed = list(_FORMATTER.parse(template))
+    except ValueError:
+        parsed = None
+    
+    if parsed is None or any(
+        field_name is not None and (format_spec or conversion or not field_name.isidentifier())
+        for _, field_name, format_spec, conversion in parsed
+    ):
+        def render(**kwargs) -> str:
+            try:
+                return template.format(**kwargs)
+            except (KeyError, ValueError, IndexError, AttributeError):
+                return template
+        return render
+    
+    pieces = [(literal, field_name) for literal, field_name, _, _ in parsed]
+    
+    def render(**kwargs) -> str:
+        try:
+            return "".join(
+                literal if field_name is None else f"{literal}{kwargs[field_name]}"
+                for literal, field_name in pieces
+            )
+        except KeyError:
+            return template
+    return render
 
 
 class ResponseManager:
@@ -12,6 +63,12 @@ class ResponseManager:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self._response_config = self.config.get("ui_preferences", {}).get("custom_responses", {})
+        # 预编译的渲染函数: 响应类型 -> 渲染函数，仅包含非空模板
+        self._renderers: Dict[str, Callable[..., Optional[str]]] = {
+            response_type: _compile_template(template)
+            for response_type, template in self._response_config.items()
+            if template and template.strip()
+        }
     
     def get_response(self, response_type: str, **kwargs) -> Optional[str]:
         """
@@ -24,83 +81,69 @@ class ResponseManager:
         Returns:
             格式化后的响应内容，如果配置为空则返回 None
         """
-        template = self._response_config.get(response_type)
-        
-        # 如果模板为空或者未配置，返回 None（不响应）
-        if not template or not template.strip():
-            return None
-        
-        try:
-            # 替换占位符
-            return template.format(**kwargs)
-        except (KeyError, ValueError) as e:
-            # 如果占位符替换失败，返回原始模板
-            return template
+        return self._renderers.get(response_type, _noop_renderer)(**kwargs)
     
     def flash_start(self, timeout: int) -> Optional[str]:
         """闪念开始响应"""
-        return self.get_response("flash_start", timeout=timeout)
+        return self._renderers.get("flash_start", _noop_renderer)(timeout=timeout)
     
     def flash_add(self) -> Optional[str]:
         """闪念添加响应"""
-        return self.get_response("flash_add")
+        return self._renderers.get("flash_add", _noop_renderer)()
     
     def flash_saved(self, tags: list = None) -> Optional[str]:
         """闪念保存成功响应"""
+        render = self._renderers.get("flash_saved")
+        if render is None:
+            return None
         if tags:
             tags_text = f"，并添加了标签：【{', '.join(tags)}】"
         else:
             tags_text = ""
-        return self.get_response("flash_saved", tags=tags_text)
+        return render(tags=tags_text)
     
     def todo_created(self, content: str, category: str = None, deadline: str = None) -> Optional[str]:
         """TODO创建成功响应"""
-        return self.get_response("todo_created", 
-                                content=content, 
-                                category=category or "", 
-                                deadline=deadline or "")
+        render = self._renderers.get("todo_created")
+        if render is None:
+            return None
+        return render(content=content, category=category or "", deadline=deadline or "")
     
     def todo_completed(self, todo_id: str, content: str) -> Optional[str]:
         """TODO完成响应"""
-        return self.get_response("todo_completed", id=todo_id, content=content)
+        return self._renderers.get("todo_completed", _noop_renderer)(id=todo_id, content=content)
     
     def note_created(self, content: str, category: str = None) -> Optional[str]:
         """笔记创建成功响应"""
-        return self.get_response("note_created", 
-                                content=content[:50] + "..." if len(content) > 50 else content, 
-                                category=category or "")
+        render = self._renderers.get("note_created")
+        if render is None:
+            # 模板未配置时直接返回，避免对长内容做无用的截取
+            return None
+        return render(content=content if len(content) <= 50 else f"{content[:50]}...",
+                      category=category or "")
     
     def item_deleted(self, item_id: str, item_type: str) -> Optional[str]:
         """项目删除成功响应"""
-        type_map = {
-            "todo": "待办",
-            "note": "笔记", 
-            "flash": "闪念"
-        }
-        return self.get_response("item_deleted", 
-                                id=item_id, 
-                                type=type_map.get(item_type, item_type))
+        render = self._renderers.get("item_deleted")
+        if render is None:
+            return None
+        return render(id=item_id, type=_TYPE_NAMES.get(item_type, item_type))
     
     def error_general(self, error: str) -> Optional[str]:
         """一般错误响应"""
-        return self.get_response("error_general", error=error)
+        return self._renderers.get("error_general", _noop_renderer)(error=error)
     
     def error_not_found(self, item_id: str, item_type: str) -> Optional[str]:
         """未找到项目错误响应"""
-        type_map = {
-            "todo": "待办",
-            "note": "笔记",
-            "flash": "闪念"
-        }
-        return self.get_response("error_not_found", 
-                                id=item_id, 
-                                type=type_map.get(item_type, item_type))
+        render = self._renderers.get("error_not_found")
+        if render is None:
+            return None
+        return render(id=item_id, type=_TYPE_NAMES.get(item_type, item_type))
     
     def command_unknown(self, command: str) -> Optional[str]:
         """未知命令响应"""
-        return self.get_response("command_unknown", command=command)
+        return self._renderers.get("command_unknown", _noop_renderer)(command=command)
     
     def should_respond(self, response_type: str) -> bool:
         """检查是否应该响应（配置不为空）"""
-        template = self._response_config.get(response_type)
-        return bool(template and template.strip())
\ No newline at end of file
+        return response_type in self._renderers
\ No newline at end of file
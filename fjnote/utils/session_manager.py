@@ -6,14 +6,24 @@ Session Management Utilities - 会话管理工具
 """
 
 import asyncio
+import heapq
+import itertools
 import re
+import weakref
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple, Set
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 
 from ..core.models import FlashSession
 from astrbot.api import logger
 
+# #标签（支持中英文），分组 1 为标签名
+_TAG_RE = re.compile(r'#([^\s#]+)')
+
+# 同时存在的闪念会话数量默认上限，超出时最久未活动的会话被提前保存
+_MAX_SESSIONS = 10000
+
 
 class ISessionObserver(ABC):
     """
@@ -37,33 +47,46 @@ class SessionManager:
     负责创建、更新、取消和监控所有用户的闪念会话。
     """
     
-    def __init__(self, timeout_seconds: int = 30):
+    def __init__(self, timeout_seconds: int = 30, max_sessions: int = _MAX_SESSIONS):
         """
         初始化会话管理器。
         
         :param timeout_seconds: 闪念会话的超时时间（秒）。
+        :param max_sessions: 同时存在的会话数量上限，用于限制内存占用。
         """
-        self.sessions: Dict[str, FlashSession] = {}
+        # 按最近活动时间排序，末尾为最近活动的会话
+        self.sessions: "OrderedDict[str, FlashSession]" = OrderedDict()
         self.timeout_seconds = timeout_seconds
-        self.observers: List[ISessionObserver] = []
+        self.max_sessions = max_sessions
+        # 弱引用集合：注册是幂等的 O(1) 操作，被替换或释放的观察者会自动注销
+        self.observers: "weakref.WeakSet[ISessionObserver]" = weakref.WeakSet()
+        # 超时调度堆: (超时时刻, user_id, generation)。会话重置计时只压入新条目，
+        # 旧条目在出堆时因 generation 不匹配而被跳过（惰性删除）
+        self._timeout_heap: List[Tuple[float, str, int]] = []
+        self._generations = itertools.count(1)
+        self._wake: Optional[asyncio.Event] = None
+        self._scheduler_task: Optional[asyncio.Task] = None
+        # 正在执行的超时通知任务，保留引用以免被垃圾回收
+        self._notify_tasks: Set[asyncio.Task] = set()
     
     def add_observer(self, observer: ISessionObserver):
         """添加一个观察者。"""
-        if observer not in self.observers:
-            self.observers.append(observer)
+        self.observers.add(observer)
     
     def remove_observer(self, observer: ISessionObserver):
         """移除一个观察者。"""
-        if observer in self.observers:
-            self.observers.remove(observer)
+        self.observers.discard(observer)
     
     async def _notify_timeout(self, session: FlashSession):
-        """通知所有观察者会话已超时。"""
-        for observer in self.observers:
-            try:
-                await observer.on_session_timeout(session)
-            except Exception as e:
-                logger.error(f"会话观察者在处理超时事件时出错: {e}")
+        """并发通知所有观察者会话已超时，单个观察者出错不影响其他观察者。"""
+        # 先复制一份，避免通知期间观察者增删导致迭代出错
+        results = await asyncio.gather(
+            *(observer.on_session_timeout(session) for observer in list(self.observers)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"会话观察者在处理超时事件时出错: {result}")
     
     async def start_session(self, user_id: str, message_data: Dict) -> FlashSession:
         """
@@ -85,7 +108,12 @@ class SessionManager:
         )
         
         self.sessions[user_id] = session
-        session.timer_task = asyncio.create_task(self._session_timeout_task(user_id))
+        self._schedule_timeout(user_id, session)
+        
+        # 超出上限时提前结束最久未活动的会话，按超时处理以免丢失内容
+        while len(self.sessions) > self.max_sessions:
+            _, oldest = self.sessions.popitem(last=False)
+            self._dispatch_timeout(oldest)
         return session
     
     async def add_message(self, user_id: str, message_data: Dict) -> Optional[FlashSession]:
@@ -101,11 +129,10 @@ class SessionManager:
             return None
         
         session.messages.append(message_data)
+        self.sessions.move_to_end(user_id)
         
         # 重置计时器
-        if session.timer_task:
-            session.timer_task.cancel()
-        session.timer_task = asyncio.create_task(self._session_timeout_task(user_id))
+        self._schedule_timeout(user_id, session)
         
         return session
     
@@ -116,40 +143,89 @@ class SessionManager:
         :param user_id: 用户的唯一标识符。
         :return: 被取消的会话对象，如果会话不存在则返回 None。
         """
-        session = self.sessions.pop(user_id, None)
-        if session and session.timer_task:
-            session.timer_task.cancel()
-        return session
+        # 堆中残留的条目会因会话已不存在而被调度器跳过
+        return self.sessions.pop(user_id, None)
+    
+    def _schedule_timeout(self, user_id: str, session: FlashSession):
+        """（重新）设置会话的超时时刻，并确保调度器正在运行。"""
+        loop = asyncio.get_running_loop()
+        session.generation = next(self._generations)
+        session.expires_at = loop.time() + self.timeout_seconds
+        heapq.heappush(self._timeout_heap, (session.expires_at, user_id, session.generation))
+        
+        if self._scheduler_task is None or self._scheduler_task.done():
+            self._wake = asyncio.Event()
+            self._scheduler_task = asyncio.create_task(self._run_scheduler())
+        else:
+            self._wake.set()
     
-    async def _session_timeout_task(self, user_id: str):
+    async def _run_scheduler(self):
         """
-        用于监控单个会话超时的异步任务。
-        任务完成后，会通知观察者。
+        单个后台协程负责所有会话的超时：睡眠到最早的超时时刻，
+        弹出到期且仍然有效的条目并通知观察者。
         """
-        try:
-            await asyncio.sleep(self.timeout_seconds)
-            session = self.sessions.pop(user_id, None)
-            if session:
-                await self._notify_timeout(session)
-        except asyncio.CancelledError:
-            # 会话被重置或取消，这是正常行为，无需处理。
-            pass
-        except Exception as e:
-            logger.error(f"会话超时任务出错 (用户: {user_id}): {e}")
-
-    async def cleanup_finished_timers(self):
-        """清理已结束的会话计时器任务，释放资源。"""
-        for user_id in list(self.sessions.keys()):
-            session = self.sessions.get(user_id)
-            if session and session.timer_task and session.timer_task.done():
-                # 通常，超时的任务会自己移除会话，但为防止意外情况，这里也进行清理
-                self.sessions.pop(user_id, None)
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wake.clear()
+            now = loop.time()
+            while self._timeout_heap and self._timeout_heap[0][0] <= now:
+                _, user_id, generation = heapq.heappop(self._timeout_heap)
+                session = self.sessions.get(user_id)
+                if session is None or session.generation != generation:
+                    continue  # 会话已被取消或计时已重置
+                del self.sessions[user_id]
+                self._dispatch_timeout(session)
+            
+            delay = self._timeout_heap[0][0] - now if self._timeout_heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _dispatch_timeout(self, session: FlashSession):
+        """在独立任务中通知观察者，通知（保存笔记）可能较慢，避免延误其他会话的超时。"""
+        task = asyncio.create_task(self._notify_timeout(session))
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+    
+    async def shutdown(self):
+        """停止超时调度器，并等待进行中的超时通知完成。"""
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            await asyncio.gather(self._scheduler_task, return_exceptions=True)
+            self._scheduler_task = None
+        self._timeout_heap.clear()
+        if self._notify_tasks:
+            await asyncio.gather(*self._notify_tasks, return_exceptions=True)
     
     def extract_tags(self, text: str) -> List[str]:
         """提取标签 - 支持中英文标签"""
-        # 修改正则表达式以支持中文标签
-        return re.findall(r'#([^\s#]+)', text)
+        # 大多数消息不含标签，先做一次廉价的字符检查
+        if '#' not in text:
+            return []
+        return _TAG_RE.findall(text)
     
     def remove_tags(self, text: str) -> str:
         """移除标签"""
-        return re.sub(r'#[^\s#]+', '', text).strip()
\ No newline at end of file
+        if '#' not in text:
+            return text.strip()
+        return _TAG_RE.sub('', text).strip()
+    
+    def split_content_and_tags(self, text: str) -> Tuple[str, List[str]]:
+        """
+        单次扫描同时完成标签提取与移除，等价于 (remove_tags(text), extract_tags(text))。
+        
+        :param text: 原始文本。
+        :return: 一个元组，包含移除标签后的内容和标签列表。
+        """
+        if '#' not in text:
+            return text.strip(), []
+        tags = []
+        pieces = []
+        last_end = 0
+        for match in _TAG_RE.finditer(text):
+            tags.append(match.group(1))
+            pieces.append(text[last_end:match.start()])
+            last_end = match.end()
+        pieces.append(text[last_end:])
+        return "".join(pieces).strip(), tags
\ No newline at end of file
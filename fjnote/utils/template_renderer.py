@@ -3,17 +3,85 @@ Template rendering utilities
 模板渲染工具，采用模板方法模式
 """
 
+import os
+import stat
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-from jinja2 import Environment, DictLoader
+from typing import Dict, Any, Tuple, Optional
+from jinja2 import Environment, DictLoader, Template, FileSystemBytecodeCache
+from markupsafe import escape
+
+
+# 字节码缓存文件名模式：字节码缓存只按模板源校验，不感知 autoescape 等环境选项，文件名带上转义标记，避免复用未转义时期的旧缓存
+_BYTECODE_CACHE_PATTERN = "__fjnote_escaped_%s.cache"
+
+# 自定义的 Jinja2 字节码缓存目录，可通过环境变量 FJNOTE_JINJA_CACHE 指定；
+# 未指定时使用 Jinja2 默认的按用户隔离目录（权限 0700 并校验属主）
+_BYTECODE_CACHE_DIR = os.environ.get("FJNOTE_JINJA_CACHE")
+
+
+def _is_private_dir(path: str) -> bool:
+    """
+    创建（如不存在）并检查缓存目录：必须是真实目录、属于当前用户且其他用户不可写。
+    缓存文件会被 marshal 加载执行，目录若可被他人控制，就可能被植入恶意字节码。
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _create_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """创建文件系统字节码缓存，目录不可用或不安全时返回 None（退化为每次启动重新编译）。"""
+    try:
+        if _BYTECODE_CACHE_DIR is None:
+            # Jinja2 自行创建按用户隔离的目录，属主或权限不符时抛出 RuntimeError
+            return FileSystemBytecodeCache(pattern=_BYTECODE_CACHE_PATTERN)
+        if not _is_private_dir(_BYTECODE_CACHE_DIR):
+            return None
+    except (OSError, RuntimeError):
+        return None
+    return FileSystemBytecodeCache(_BYTECODE_CACHE_DIR, _BYTECODE_CACHE_PATTERN)
+
+
+_BYTECODE_CACHE = _create_bytecode_cache()
+
+# 允许自定义覆盖的模板: (模板名, custom_templates 中的配置项)
+_CUSTOM_TEMPLATE_KEYS = (
+    ('todo_list', 'todo_list_template'),
+    ('note_list', 'note_list_template'),
+    ('search_results', 'search_results_template'),
+)
+
+# 已编译模板的缓存: 模板源 -> (Environment, 模板名 -> Template)
+_ENV_CACHE: Dict[Tuple[Tuple[str, str], ...], Tuple[Environment, Dict[str, Template]]] = {}
+
+
+def _get_compiled(templates: Dict[str, str]) -> Tuple[Environment, Dict[str, Template]]:
+    """
+    获取一组模板源对应的 Environment 与已编译模板，首次遇到时编译并缓存。
+    以模板源本身作为缓存键，任何影响模板的配置变化都会自然得到新的缓存项。
+    """
+    key = tuple(sorted(templates.items()))
+    cached = _ENV_CACHE.get(key)
+    if cached is None:
+        # trim_blocks/lstrip_blocks 去掉块标签留下的空行与缩进，减小输出体积；
+        # 模板源不会变化，无需检查重新加载，也无需限制缓存大小；
+        # 笔记内容由用户输入，输出前统一做 HTML 转义（模板名不带 .html 后缀，select_autoescape 不会生效，直接开启）
+        env = Environment(loader=DictLoader(dict(templates)), trim_blocks=True, lstrip_blocks=True,
+                          autoescape=True, auto_reload=False, cache_size=-1, bytecode_cache=_BYTECODE_CACHE)
+        cached = _ENV_CACHE[key] = (env, {name: env.get_template(name) for name in templates})
+    return cached
 
 
 class ITemplateRenderer(ABC):
     """模板渲染器接口"""
     
     @abstractmethod
-    async def render(self, template_name: str, data: Dict[str, Any]) -> str:
-        """渲染模板"""
+    def render(self, template_name: str, data: Dict[str, Any]) -> str:
+        """渲染模板（纯 CPU 计算，同步调用即可）"""
         pass
 
 
@@ -22,32 +90,40 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
     
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
+        # 界面偏好设置，模板构建时多次读取，只取一次
+        self._ui = self.config.get("ui_preferences") or {}
+        # 所有内置模板共用的外层样式，只需按配置计算一次
+        self._base_style = self._get_base_style()
         self.templates = {
             'todo_list': self._get_todo_list_template(),
             'note_list': self._get_note_list_template(),
             'search_results': self._get_search_results_template(),
-            'help': self._get_help_template(),
-            'tags_list': self._get_tags_list_template()
+            'help': self._get_help_template()
         }
         self._load_custom_templates()
-        self.env = Environment(loader=DictLoader(self.templates))
+        # 模板在初始化后不再变化，预先编译，渲染时只需一次字典查找；
+        # 相同模板源（即相同的相关配置）的渲染器共享同一份编译结果
+        self.env, self.compiled = _get_compiled(self.templates)
+        # 帮助模板不依赖任何数据，渲染一次后直接复用输出
+        self._help_html = self.compiled['help'].render()
+        # 标签列表结构固定，预先生成 % 格式串，绕过 Jinja 渲染
+        self._tags_list_formats = self._get_tags_list_formats()
     
     def _load_custom_templates(self):
         """加载自定义模板"""
-        custom_config = self.config.get("ui_preferences", {}).get("custom_templates", {})
-        if custom_config.get("enable_custom", False):
-            # 加载自定义模板
-            if custom_config.get("todo_list_template"):
-                self.templates['todo_list'] = custom_config["todo_list_template"]
-            if custom_config.get("note_list_template"):
-                self.templates['note_list'] = custom_config["note_list_template"]
-            if custom_config.get("search_results_template"):
-                self.templates['search_results'] = custom_config["search_results_template"]
+        custom_config = self._ui.get("custom_templates")
+        # 默认未配置自定义模板，直接返回
+        if not custom_config or not custom_config.get("enable_custom", False):
+            return
+        for name, key in _CUSTOM_TEMPLATE_KEYS:
+            template = custom_config.get(key)
+            if template:
+                self.templates[name] = template
     
     def _get_base_style(self) -> str:
         """获取基础样式 - 专为移动端优化"""
-        font_size = self.config.get("ui_preferences", {}).get("font_size", 24)  # 增大默认字体
-        compact_mode = self.config.get("ui_preferences", {}).get("compact_mode", True)  # 默认紧凑模式
+        font_size = self._ui.get("font_size", 24)  # 增大默认字体
+        compact_mode = self._ui.get("compact_mode", True)  # 默认紧凑模式
         
         # 极致紧凑设计，移除所有不必要的空白
         padding = "6px" if compact_mode else "8px"
@@ -70,9 +146,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
     
     def _get_todo_list_template(self) -> str:
         """获取极致紧凑的TODO列表模板 - 专为移动端优化"""
-        font_size = self.config.get("ui_preferences", {}).get("font_size", 24)  # 增大默认字体
-        compact_mode = self.config.get("ui_preferences", {}).get("compact_mode", True)  # 默认紧凑
-        show_timestamps = self.config.get("ui_preferences", {}).get("show_timestamps", False)  # 默认隐藏时间戳
+        font_size = self._ui.get("font_size", 24)  # 增大默认字体
         
         # 极致紧凑的间距设计
         title_size = font_size + 2  # 标题稍大一点
@@ -81,7 +155,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
         section_margin = "4px 0 2px 0"  # 分类间距
         
         return f'''
-<div style="{self._get_base_style()}">
+<div style="{self._base_style}">
     <div style="text-align: center; margin: 0 0 6px 0; font-size: {title_size}px; font-weight: 700;">
         📝 ToDo{{{{ " - " + category if category else "" }}}}
     </div>
@@ -123,9 +197,8 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
     
     def _get_note_list_template(self) -> str:
         """获取紧凑的笔记列表模板"""
-        font_size = self.config.get("ui_preferences", {}).get("font_size", 20)
-        compact_mode = self.config.get("ui_preferences", {}).get("compact_mode", False)
-        show_timestamps = self.config.get("ui_preferences", {}).get("show_timestamps", True)
+        font_size = self._ui.get("font_size", 20)
+        compact_mode = self._ui.get("compact_mode", False)
         
         title_size = font_size + 4
         item_padding = "4px 8px" if compact_mode else "6px 10px"
@@ -133,7 +206,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
         section_margin = "8px 0 4px 0" if compact_mode else "12px 0 6px 0"
         
         return f'''
-<div style="{self._get_base_style()} background: linear-gradient(135deg, #74b9ff 0%, #0984e3 100%);">
+<div style="{self._base_style} background: linear-gradient(135deg, #74b9ff 0%, #0984e3 100%);">
     <div style="text-align: center; margin: 0 0 {8 if compact_mode else 12}px 0; font-size: {title_size}px; font-weight: 700;">
         📝 笔记{{{{ " - " + category if category else "" }}}}
     </div>
@@ -150,7 +223,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
                         <div style="flex: 1;">
                             <div style="display: flex; align-items: center; margin-bottom: 2px;">
                                 <span style="color: #ffd700; margin-right: 6px; font-size: {font_size - 4}px; font-weight: 600;">[{{{{ note.id }}}}]</span>
-                                <span style="font-size: {font_size}px;">{{{{ note.content[:120] }}}}{{{{ "..." if note.content|length > 120 else "" }}}}</span>
+                                <span style="font-size: {font_size}px;">{{{{ note.display_content }}}}</span>
                             </div>
                             {{% if note.tags %}}
                                 <div style="margin-top: 3px;">
@@ -180,8 +253,8 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
     
     def _get_search_results_template(self) -> str:
         """获取紧凑的搜索结果模板"""
-        font_size = self.config.get("ui_preferences", {}).get("font_size", 20)
-        compact_mode = self.config.get("ui_preferences", {}).get("compact_mode", False)
+        font_size = self._ui.get("font_size", 20)
+        compact_mode = self._ui.get("compact_mode", False)
         
         title_size = font_size + 4
         item_padding = "4px 8px" if compact_mode else "6px 10px"
@@ -189,7 +262,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
         section_margin = "8px 0 4px 0" if compact_mode else "10px 0 5px 0"
         
         return f'''
-<div style="{self._get_base_style()} background: linear-gradient(135deg, #00b894 0%, #00a085 100%);">
+<div style="{self._base_style} background: linear-gradient(135deg, #00b894 0%, #00a085 100%);">
     <div style="text-align: center; margin: 0 0 {8 if compact_mode else 12}px 0; font-size: {title_size}px; font-weight: 700;">
         🔍 "{{{{ keyword }}}}"
     </div>
@@ -201,7 +274,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
         {{% for note in flash_notes %}}
             <div style="margin: {item_margin}; padding: {item_padding}; background: rgba(255,255,255,0.15); border-radius: 4px; border-left: 3px solid #fdcb6e;">
                 <div style="font-size: {font_size - 6}px; color: #ddd; margin-bottom: 2px;">{{{{ note.created_at }}}}</div>
-                <div style="font-size: {font_size - 2}px;">{{{{ note.content[:100] }}}}{{{{ "..." if note.content|length > 100 else "" }}}}</div>
+                <div style="font-size: {font_size - 2}px;">{{{{ note.display_content }}}}</div>
             </div>
         {{% endfor %}}
     {{% endif %}}
@@ -213,7 +286,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
         {{% for note in note_notes %}}
             <div style="margin: {item_margin}; padding: {item_padding}; background: rgba(255,255,255,0.15); border-radius: 4px; border-left: 3px solid #74b9ff;">
                 <div style="font-size: {font_size - 6}px; color: #ddd; margin-bottom: 2px;">{{{{ note.created_at }}}}</div>
-                <div style="font-size: {font_size - 2}px;">{{{{ note.content[:100] }}}}{{{{ "..." if note.content|length > 100 else "" }}}}</div>
+                <div style="font-size: {font_size - 2}px;">{{{{ note.display_content }}}}</div>
             </div>
         {{% endfor %}}
     {{% endif %}}
@@ -225,7 +298,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
         {{% for note in todo_notes %}}
             <div style="margin: {item_margin}; padding: {item_padding}; background: rgba(255,255,255,0.15); border-radius: 4px; border-left: 3px solid #e17055;">
                 <div style="font-size: {font_size - 6}px; color: #ddd; margin-bottom: 2px;">{{{{ note.created_at }}}}</div>
-                <div style="font-size: {font_size - 2}px;">{{{{ note.content[:100] }}}}{{{{ "..." if note.content|length > 100 else "" }}}}</div>
+                <div style="font-size: {font_size - 2}px;">{{{{ note.display_content }}}}</div>
             </div>
         {{% endfor %}}
     {{% endif %}}
@@ -239,8 +312,8 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
     
     def _get_help_template(self) -> str:
         """获取紧凑的帮助模板"""
-        font_size = self.config.get("ui_preferences", {}).get("font_size", 20)
-        compact_mode = self.config.get("ui_preferences", {}).get("compact_mode", False)
+        font_size = self._ui.get("font_size", 20)
+        compact_mode = self._ui.get("compact_mode", False)
         
         title_size = font_size + 6
         section_margin = "6px 0 3px 0" if compact_mode else "10px 0 5px 0"
@@ -248,7 +321,7 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
         item_margin = "1px 0" if compact_mode else "2px 0"
         
         return f'''
-<div style="{self._get_base_style()} background: linear-gradient(135deg, #a29bfe 0%, #6c5ce7 100%);">
+<div style="{self._base_style} background: linear-gradient(135deg, #a29bfe 0%, #6c5ce7 100%);">
     <div style="text-align: center; margin: 0 0 {6 if compact_mode else 10}px 0; font-size: {title_size}px; font-weight: 700;">
         📖 FJNote 使用指南
     </div>
@@ -291,37 +364,49 @@ class Jinja2TemplateRenderer(ITemplateRenderer):
     </div>
 </div>'''
     
-    def _get_tags_list_template(self) -> str:
-        """获取紧凑的标签列表模板"""
-        font_size = self.config.get("ui_preferences", {}).get("font_size", 20)
-        compact_mode = self.config.get("ui_preferences", {}).get("compact_mode", False)
+    def _get_tags_list_formats(self) -> Tuple[str, str, str, str]:
+        """
+        获取紧凑的标签列表各片段：(页头, 单个标签的 % 格式串, 空列表提示, 页尾)。
+        标签列表结构固定、没有控制流，直接用 % 格式化拼接，无需经过 Jinja。
+        """
+        font_size = self._ui.get("font_size", 20)
+        compact_mode = self._ui.get("compact_mode", False)
         
         title_size = font_size + 4
         item_padding = "4px 8px" if compact_mode else "6px 10px"
         item_margin = "2px 0" if compact_mode else "3px 0"
         
-        return f'''
-<div style="{self._get_base_style()} background: linear-gradient(135deg, #fd79a8 0%, #e84393 100%);">
+        header = f'''
+<div style="{self._base_style} background: linear-gradient(135deg, #fd79a8 0%, #e84393 100%);">
     <div style="text-align: center; margin: 0 0 {8 if compact_mode else 12}px 0; font-size: {title_size}px; font-weight: 700;">
         🏷️ 标签统计
     </div>
-    {{% if tags %}}
-        {{% for tag in tags %}}
-            <div style="margin: {item_margin}; padding: {item_padding}; background: rgba(255,255,255,0.15); border-radius: 4px; display: flex; justify-content: space-between; align-items: center; border-left: 3px solid #ffd700;">
-                <span style="font-weight: 600; font-size: {font_size}px;">#{{{{ tag.name }}}}</span>
-                <span style="color: #ffd700; font-weight: 700; background: rgba(255,215,0,0.25); padding: 2px 6px; border-radius: 8px; font-size: {font_size - 4}px;">
-                    {{{{ tag.count }}}}
-                </span>
-            </div>
-        {{% endfor %}}
-    {{% else %}}
-        <div style="text-align: center; padding: 20px; color: #ddd; font-style: italic; font-size: {font_size}px;">
-            🏷️ 暂无标签
-        </div>
-    {{% endif %}}
-</div>'''
+'''
+        # 单个标签只保留名称与数量两个占位符
+        item = f'''    <div style="margin: {item_margin}; padding: {item_padding}; background: rgba(255,255,255,0.15); border-radius: 4px; display: flex; justify-content: space-between; align-items: center; border-left: 3px solid #ffd700;">
+        <span style="font-weight: 600; font-size: {font_size}px;">#%s</span>
+        <span style="color: #ffd700; font-weight: 700; background: rgba(255,215,0,0.25); padding: 2px 6px; border-radius: 8px; font-size: {font_size - 4}px;">%s</span>
+    </div>
+'''
+        empty = f'''    <div style="text-align: center; padding: 20px; color: #ddd; font-style: italic; font-size: {font_size}px;">
+        🏷️ 暂无标签
+    </div>
+'''
+        return header, item, empty, '</div>'
+    
+    def _render_tags_list(self, data: Dict[str, Any]) -> str:
+        """以 % 格式化渲染标签列表"""
+        header, item, empty, footer = self._tags_list_formats
+        tags = data.get('tags')
+        if not tags:
+            return header + empty + footer
+        body = "".join([item % (escape(t.get("name", "")), escape(t.get("count", ""))) for t in tags])
+        return header + body + footer
     
-    async def render(self, template_name: str, data: Dict[str, Any]) -> str:
+    def render(self, template_name: str, data: Dict[str, Any]) -> str:
         """渲染模板"""
-        template = self.env.get_template(template_name)
-        return template.render(**data)
\ No newline at end of file
+        if template_name == 'help':
+            return self._help_html
+        if template_name == 'tags_list':
+            return self._render_tags_list(data)
+        return self.compiled[template_name].render(**data)
\ No newline at end of file
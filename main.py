@@ -8,7 +8,7 @@ FJNote Main Plugin - 插件主入口
 """
 
 import asyncio
-from datetime import datetime
+import time
 from typing import Dict, Any
 
 from astrbot.api.event import filter, AstrMessageEvent
@@ -17,11 +17,12 @@ from astrbot.api import logger, AstrBotConfig
 import astrbot.api.message_components as Comp
 
 # 核心服务与组件
-from .fjnote.services.blinko_api import BlinkoApiClient
+from .fjnote.services.blinko_api import get_client, release_client
 from .fjnote.strategies.flash_strategy import FlashNoteStrategy
 from .fjnote.strategies.todo_strategy import TodoNoteStrategy
 from .fjnote.strategies.note_strategy import NoteStrategy
 from .fjnote.utils.session_manager import SessionManager
+from .fjnote.utils.recent_list_store import RecentListStore
 from .fjnote.utils.template_renderer import Jinja2TemplateRenderer
 from .fjnote.utils.response_manager import ResponseManager
 from .fjnote.utils.file_uploader import FileUploader
@@ -47,23 +48,42 @@ class FJNotePlugin(Star):
         
         # 初始化所有核心组件
         self._init_components()
-        
-        # 启动后台任务，用于清理超时的会话计时器
-        asyncio.create_task(self._start_session_monitor())
     
     def _init_components(self):
         """
         初始化并装配所有核心组件。
         这种方式使得各个组件的职责单一，易于测试和替换。
         """
+        # 配置快照，配置变更时插件会被重新加载，因此只需在初始化时复制一次
+        self.config_snapshot = dict(self.config)
+        self.ui_preferences = self.config_snapshot.get("ui_preferences") or {}
+        self.enable_rich_display = self.config_snapshot.get("enable_rich_display", True)
+        advanced_settings = self.config_snapshot.get("advanced_settings", {})
+        
+        # 闪念过滤配置：每条消息都会用到，预先解析，忽略前缀统一转为小写
+        filters_config = self.config_snapshot.get("flash_filters") or {}
+        self._flash_min_length = filters_config.get("min_content_length", 5)
+        ignore_prefixes_str = filters_config.get("ignore_prefixes", "/t") or ""
+        self._flash_ignore_prefixes = tuple(
+            prefix.strip().lower() for prefix in ignore_prefixes_str.split(",") if prefix.strip()
+        )
+        
         # API 客户端（仓储模式）
-        self.api_client = BlinkoApiClient(
-            base_url=self.config.get("blinko_base_url", "http://localhost:1111"),
-            token=self.config.get("blinko_token", "")
+        self.api_client = get_client(
+            self.config.get("blinko_base_url", "http://localhost:1111"),
+            self.config.get("blinko_token", ""),
+            advanced_settings.get("enable_http2", False),
+            advanced_settings.get("connection_pool_limit", 64),
+            advanced_settings.get("keepalive_timeout", 75),
+            advanced_settings.get("api_timeout", 30)
         )
         
         # 文件上传工具
-        self.file_uploader = FileUploader(self.api_client)
+        self.file_uploader = FileUploader(
+            self.api_client,
+            advanced_settings.get("max_upload_concurrency", 4),
+            advanced_settings.get("download_timeout", 60)
+        )
         
         # 笔记策略（策略模式）
         self.flash_strategy = FlashNoteStrategy(self.api_client)
@@ -71,47 +91,43 @@ class FJNotePlugin(Star):
         self.note_strategy = NoteStrategy(self.api_client)
         
         # 模板渲染器
-        self.template_renderer = Jinja2TemplateRenderer(dict(self.config))
+        self.template_renderer = Jinja2TemplateRenderer(self.config_snapshot)
         
         # 响应管理器
-        self.response_manager = ResponseManager(dict(self.config))
+        self.response_manager = ResponseManager(self.config_snapshot)
         
         # 闪念会话处理器（观察者）
         self.flash_session_handler = FlashSessionHandler(
             self.flash_strategy,
             self.file_uploader,
             self.response_manager,
-            dict(self.config)
+            self.config_snapshot
         )
         
         # 会话管理器（被观察者）
         self.session_manager = SessionManager(
-            timeout_seconds=self.config.get("flash_session_timeout", 30)
+            timeout_seconds=self.config.get("flash_session_timeout", 30),
+            max_sessions=advanced_settings.get("max_flash_sessions", 10000)
         )
         self.session_manager.add_observer(self.flash_session_handler)  # 注册闪念处理器为观察者
         
+        # 用户最近查看的待办列表，用于解析 #done/#del/#edit 的编号
+        self.recent_lists = RecentListStore()
+        
         # 命令工厂（工厂模式）
         self.command_factory = CommandFactory(self)
     
-    async def _start_session_monitor(self):
-        """启动会话监控任务，定期清理已完成的计时器任务以释放资源。"""
-        while True:
-            try:
-                await asyncio.sleep(1)
-                await self.session_manager.cleanup_finished_timers()
-            except Exception as e:
-                logger.error(f"会话监控任务出错: {e}")
-    
     async def _handle_multimedia_message(self, event: AstrMessageEvent) -> Dict[str, Any]:
         """
         解析消息事件，提取文本和多媒体信息。
         :return: 一个包含消息类型、内容、URL等信息的字典。
         """
-        # 基础消息数据包含文本内容
+        # 基础消息数据包含文本内容；时间戳保存为 epoch 浮点数，需要展示时再格式化
+        now = time.time()
         message_data = {
             "type": "text",
             "content": event.message_str,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
         
         # 检查并附加多媒体信息
@@ -120,7 +136,7 @@ class FJNotePlugin(Star):
                 message_data.update({
                     "type": "image",
                     "url": component.url if hasattr(component, 'url') else component.file,
-                    "filename": f"image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg",
+                    "filename": f"image_{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}.jpg",
                 })
             elif hasattr(component, 'file') and hasattr(component, 'name'):
                 message_data.update({
@@ -136,28 +152,24 @@ class FJNotePlugin(Star):
         检查是否应该记录闪念
         根据配置过滤短内容和指定前缀
         """
-        # 获取过滤配置
-        filters_config = self.config.get("flash_filters", {})
-        min_length = filters_config.get("min_content_length", 5)
-        ignore_prefixes_str = filters_config.get("ignore_prefixes", "/t")
-        
-        # 解析忽略前缀列表
-        ignore_prefixes = []
-        if ignore_prefixes_str:
-            ignore_prefixes = [prefix.strip() for prefix in ignore_prefixes_str.split(",") if prefix.strip()]
+        stripped = content.strip()
         
         # 检查内容长度
-        if len(content.strip()) < min_length:
+        if len(stripped) < self._flash_min_length:
             return False
         
-        # 检查是否以忽略前缀开头
-        content_lower = content.strip().lower()
-        for prefix in ignore_prefixes:
-            prefix_lower = prefix.lower()
+        # 未配置忽略前缀时无需再做任何前缀处理
+        if not self._flash_ignore_prefixes:
+            return True
+        
+        # 检查是否以忽略前缀开头；先用元组 startswith 一次性排除绝大多数消息
+        content_lower = stripped.lower()
+        if not content_lower.startswith(self._flash_ignore_prefixes):
+            return True
+        for prefix in self._flash_ignore_prefixes:
             # 精确匹配前缀：要么是完整匹配，要么后面跟着空格
-            if content_lower.startswith(prefix_lower):
-                # 如果前缀后面是空格或者就是完整的前缀，则匹配
-                if len(content_lower) == len(prefix_lower) or content_lower[len(prefix_lower)] == ' ':
+            if content_lower.startswith(prefix):
+                if len(content_lower) == len(prefix) or content_lower[len(prefix)] == ' ':
                     return False
         
         return True
@@ -189,13 +201,14 @@ class FJNotePlugin(Star):
         
         # 处理命令
         if message_text.startswith('#'):
-            command_parts = message_text[1:].split()
+            # 先只切出命令名，确认存在对应处理器后再拆分参数
+            command_parts = message_text[1:].split(None, 1)
             if command_parts:
                 command = command_parts[0].lower()
-                args = command_parts[1:]
                 
                 handler = self.command_factory.get_handler(command)
                 if handler:
+                    args = command_parts[1].split() if len(command_parts) > 1 else []
                     try:
                         result = await handler.handle(event, args)
                         if result:  # 只有当有响应内容时才返回
@@ -242,20 +255,33 @@ class FJNotePlugin(Star):
             if error_response:
                 yield event.plain_result(error_response)
     
+    async def _cancel_and_save(self, user_id: str):
+        """
+        取消指定用户的闪念会话并立即保存。
+        
+        :param user_id: 用户ID
+        """
+        session = await self.session_manager.cancel_session(user_id)
+        if session:
+            await self.flash_session_handler.on_session_timeout(session)
+    
     async def terminate(self):
         """
         插件终止时的清理工作
         保存所有未完成的闪念会话
         """
         try:
-            # 保存所有活跃会话
-            for user_id in list(self.session_manager.sessions.keys()):
-                session = await self.session_manager.cancel_session(user_id)
-                if session:
-                    await self._save_flash_session(session)
+            # 并发保存所有活跃会话，各会话的保存互不依赖
+            user_ids = list(self.session_manager.sessions.keys())
+            await asyncio.gather(*(self._cancel_and_save(user_id) for user_id in user_ids),
+                                 return_exceptions=True)
+            
+            # 停止会话超时调度器
+            await self.session_manager.shutdown()
             
-            # 关闭 API 客户端
-            await self.api_client.close()
+            # 关闭 API 客户端与文件下载会话
+            await release_client(self.api_client)
+            await self.file_uploader.close()
             
             logger.info("FJNote plugin terminated successfully")
             
@@ -5,10 +5,24 @@ FJNote AstrBot插件打包脚本
 """
 
 import os
+import re
 import zipfile
 import shutil
 from pathlib import Path
 
+# 打包时整体跳过、不再向下遍历的目录
+_EXCLUDE_DIRS = frozenset({"__pycache__", ".git", "venv", "dist", "docs"})
+
+# 排除的文件模式，按相对路径（/ 分隔）匹配，预编译为单个正则
+_EXCLUDE_RE = re.compile(
+    r"(^|/)(__pycache__|\.git|venv|dist|docs)/"
+    r"|\.py[co]$|(^|/)\.DS_Store$|\.egg-info(/|$)"
+    r"|(^|/)test_[^/]*\.py$|(^|/)(run|package|main_simple)\.py$"
+)
+
+# ZIP_DEFLATED 压缩级别
+_COMPRESS_LEVEL = 6
+
 def create_plugin_package():
     """创建插件包"""
     print("📦 开始打包 FJNote 插件...")
@@ -38,26 +52,10 @@ def create_plugin_package():
         "README.md"
     ]
     
-    # 排除的文件模式
-    exclude_patterns = [
-        "__pycache__",
-        "*.pyc",
-        "*.pyo", 
-        ".DS_Store",
-        "*.egg-info",
-        ".git",
-        "venv/",
-        "test_*.py",
-        "run.py",
-        "package.py",
-        "dist/",
-        "docs/"
-    ]
-    
     print(f"📁 创建 zip 包: {zip_file}")
     print(f"📂 插件目录: {plugin_name}/")
     
-    with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as zf:
+    with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED, compresslevel=_COMPRESS_LEVEL) as zf:
         # 首先创建插件目录结构
         zf.writestr(f"{plugin_name}/", "")  # 创建空目录
         
@@ -70,7 +68,7 @@ def create_plugin_package():
                 
             if item_path.is_file():
                 # 单个文件 - 添加到插件目录下
-                if not should_exclude(item_path, exclude_patterns):
+                if not should_exclude(item):
                     arc_path = f"{plugin_name}/{item}"
                     zf.write(item_path, arc_path)
                     print(f"✅ 添加文件: {arc_path}")
@@ -78,16 +76,26 @@ def create_plugin_package():
                     print(f"⚠️  排除文件: {item}")
             
             elif item_path.is_dir():
-                # 目录递归添加 - 添加到插件目录下
-                for file_path in item_path.rglob("*"):
-                    if file_path.is_file() and not should_exclude(file_path, exclude_patterns):
+                # 目录递归添加 - 添加到插件目录下；排除的目录直接剪枝，不再进入
+                for dirpath, dirnames, filenames in os.walk(item_path):
+                    rel_dir = Path(dirpath).relative_to(root_dir).as_posix()
+                    kept = []
+                    for d in dirnames:
+                        if d in _EXCLUDE_DIRS or d.endswith(".egg-info"):
+                            print(f"⚠️  排除目录: {rel_dir}/{d}/")
+                        else:
+                            kept.append(d)
+                    dirnames[:] = kept
+                    
+                    for name in filenames:
                         # 计算相对路径并添加插件目录前缀
-                        rel_path = file_path.relative_to(root_dir)
+                        rel_path = f"{rel_dir}/{name}"
+                        if should_exclude(rel_path):
+                            print(f"⚠️  排除文件: {rel_path}")
+                            continue
                         arc_path = f"{plugin_name}/{rel_path}"
-                        zf.write(file_path, arc_path)
+                        zf.write(os.path.join(dirpath, name), arc_path)
                         print(f"✅ 添加文件: {arc_path}")
-                    elif should_exclude(file_path, exclude_patterns):
-                        print(f"⚠️  排除文件: {file_path.relative_to(root_dir)}")
     
     # 验证包内容
     print(f"\n📋 包内容验证:")
@@ -109,19 +117,9 @@ def create_plugin_package():
     print("4. 配置 Blinko API 信息")
     print("5. 启用插件")
 
-def should_exclude(file_path: Path, exclude_patterns: list) -> bool:
-    """检查文件是否应该被排除"""
-    file_str = str(file_path)
-    
-    for pattern in exclude_patterns:
-        if pattern in file_str:
-            return True
-        if file_path.name == pattern:
-            return True
-        if pattern.endswith("/") and pattern[:-1] in file_path.parts:
-            return True
-    
-    return False
+def should_exclude(rel_path: str) -> bool:
+    """检查文件是否应该被排除（rel_path 为相对项目根目录、以 / 分隔的路径）"""
+    return _EXCLUDE_RE.search(rel_path) is not None
 
 if __name__ == "__main__":
     create_plugin_package()
\ No newline at end of file
@@ -7,6 +7,7 @@ FJNote 最终测试工具
 import asyncio
 import sys
 import os
+import threading
 import types
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -15,10 +16,17 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 def setup_minimal_env():
     """最小化环境设置"""
     class MockLogger:
-        def info(self, msg): print(f"[INFO] {msg}")
-        def error(self, msg): print(f"[ERROR] {msg}")
-        def warning(self, msg): print(f"[WARNING] {msg}")
-        def debug(self, msg): print(f"[DEBUG] {msg}")
+        """按级别过滤的简易日志：低于阈值的消息直接跳过，连格式化也不做"""
+        __slots__ = ("level",)
+        def __init__(self, level: int = 20): self.level = level  # 默认 INFO
+        def _log(self, level, tag, msg, args):
+            if level >= self.level:
+                # 兼容 logger.info("... %s", arg) 形式的延迟格式化
+                sys.stdout.write(f"{tag}{msg % args if args else msg}\n")
+        def debug(self, msg, *args): self._log(10, "[DEBUG] ", msg, args)
+        def info(self, msg, *args): self._log(20, "[INFO] ", msg, args)
+        def warning(self, msg, *args): self._log(30, "[WARNING] ", msg, args)
+        def error(self, msg, *args): self._log(40, "[ERROR] ", msg, args)
 
     class MockConfig(dict):
         def __init__(self):
@@ -36,27 +44,43 @@ def setup_minimal_env():
             self.config = MockConfig()
 
     class MockPlain:
+        __slots__ = ("text",)
         def __init__(self, text: str): self.text = text
 
     class MockImage:
+        __slots__ = ("file",)
         def __init__(self, file: str): self.file = file
 
     class MockMessageResult:
+        __slots__ = ("chain",)
         def __init__(self, components):
-            self.chain = components if isinstance(components, list) else [components]
+            # 组件链只读，统一保存为元组
+            self.chain = tuple(components) if isinstance(components, (list, tuple)) else (components,)
+
+    class MockSender:
+        __slots__ = ("id", "name")
+        def __init__(self, sender_id: str, name: str):
+            self.id = sender_id
+            self.name = name
+
+    class MockMsgObj:
+        __slots__ = ("message", "sender")
+        def __init__(self, plain: MockPlain, sender: MockSender):
+            self.message = [plain]
+            self.sender = sender
 
     class MockEvent:
         def __init__(self, message: str, sender_id: str = "test_user"):
             self.message_str = message
             self.sender_id = sender_id
             self.unified_msg_origin = f"test:{sender_id}"
-            
-            class MockMsgObj:
-                def __init__(self, msg):
-                    self.message = [MockPlain(msg)]
-                    self.sender = type('Sender', (), {'id': sender_id, 'name': 'TestUser'})()
-            
-            self.message_obj = MockMsgObj(message)
+            self._plain = MockPlain(message)
+            self.message_obj = MockMsgObj(self._plain, MockSender(sender_id, "TestUser"))
+        
+        def reset(self, message: str):
+            """复用同一个事件对象承载下一条消息，就地更新文本"""
+            self.message_str = message
+            self._plain.text = message
         
         def get_sender_id(self): return self.sender_id
         def get_sender_name(self): return "TestUser"
@@ -72,12 +96,11 @@ def setup_minimal_env():
 
     # Event 模块
     event_mod = types.ModuleType('astrbot.api.event')
-    filter_mod = types.ModuleType('filter')
-    EventMessageType = types.ModuleType('EventMessageType')
-    EventMessageType.PRIVATE_MESSAGE = 'private'
-    filter_mod.EventMessageType = EventMessageType
-    filter_mod.event_message_type = lambda event_type: lambda func: func
-    event_mod.filter = filter_mod
+    # filter 只需属性访问，不注册为模块，用 SimpleNamespace 即可
+    event_mod.filter = types.SimpleNamespace(
+        EventMessageType=types.SimpleNamespace(PRIVATE_MESSAGE='private', GROUP_MESSAGE='group'),
+        event_message_type=lambda event_type: lambda func: func
+    )
     event_mod.AstrMessageEvent = MockEvent
     event_mod.MessageEventResult = MockMessageResult
 
@@ -98,18 +121,15 @@ def setup_minimal_env():
     comp_mod.Image = MockImage
 
     # 注册模块
-    modules = {
+    sys.modules.update({
         'astrbot': astrbot,
         'astrbot.api': astrbot_api,
         'astrbot.api.event': event_mod,
         'astrbot.api.star': star_mod,
         'astrbot.api.message_components': comp_mod
-    }
-    
-    for name, mod in modules.items():
-        sys.modules[name] = mod
+    })
     
-    return MockEvent, MockContext
+    return MockEvent, MockContext, MockPlain
 
 
 async def main():
@@ -117,8 +137,12 @@ async def main():
     print("🎮 FJNote 最终测试")
     print("=" * 30)
     
+    # Python 3.12+ 使用 eager 任务工厂：无需等待即可完成的任务不再经过一轮事件循环调度
+    if sys.version_info >= (3, 12):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    
     # 设置环境
-    MockEvent, MockContext = setup_minimal_env()
+    MockEvent, MockContext, MockPlain = setup_minimal_env()
     
     # 初始化插件
     try:
@@ -130,6 +154,9 @@ async def main():
         print(f"❌ 初始化失败: {e}")
         return
     
+    # 指定 --warmup 时，在用户阅读帮助信息期间完成 DNS/TCP/TLS 握手，首条消息无需再等待建连
+    warmup_task = asyncio.create_task(plugin.api_client.warm_up()) if "--warmup" in sys.argv[1:] else None
+    
     print("📝 支持的命令:")
     print("- 消息内容 → 闪念记录")
     print("- #todo 任务 #标签 → 添加待办")
@@ -138,33 +165,68 @@ async def main():
     print("- #tags → 查看标签")
     print("- quit → 退出\n")
     
-    # 交互循环
-    try:
+    # 交互循环：读取输入与处理消息流水线化，读取在专用线程中进行，不会阻塞事件循环（如闪念超时）
+    queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+    
+    def reader(loop: asyncio.AbstractEventLoop):
+        """专用守护线程：阻塞读取输入并投递到队列，遇到 quit 或 EOF 时放入 None 作为结束标记"""
         while True:
-            user_input = input("💬 ").strip()
-            
+            line = sys.stdin.readline()
+            if not line or line.strip().lower() == 'quit':
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop)
+                return
+            # 等待放入完成：队列已满时读取线程随之暂停，形成背压
+            asyncio.run_coroutine_threadsafe(queue.put(line.strip()), loop).result()
+    
+    async def consumer():
+        """从队列取出消息交给插件处理并输出结果，处理完一条后再显示输入提示"""
+        # 消息逐条串行处理，复用同一个事件对象
+        event = MockEvent("")
+        write = sys.stdout.write
+        plain_type = MockPlain
+        while True:
+            write("💬 ")
+            sys.stdout.flush()
+            user_input = await queue.get()
+            if user_input is None:
+                return
             if not user_input:
                 continue
-            if user_input.lower() == 'quit':
-                break
             
             try:
-                event = MockEvent(user_input)
+                event.reset(user_input)
                 async for result in plugin.on_private_message(event):
                     if result and result.chain:
-                        for comp in result.chain:
-                            if hasattr(comp, 'text'):
-                                print(f"🤖 {comp.text}")
+                        # 一次响应的所有组件合并为一次写入
+                        parts = [f"🤖 {comp.text}" for comp in result.chain if type(comp) is plain_type]
+                        if parts:
+                            write("\n".join(parts) + "\n")
             except Exception as e:
                 print(f"❌ 处理错误: {e}")
-                
-    except (KeyboardInterrupt, EOFError):
-        pass
     
-    print("\n👋 退出中...")
-    await plugin.terminate()
-    print("✅ 测试结束")
+    # 守护线程不会在退出时被等待，Ctrl+C 或 quit 后无需再输入一行才能结束
+    threading.Thread(target=reader, args=(asyncio.get_running_loop(),), daemon=True).start()
+    try:
+        await consumer()
+    finally:
+        # Ctrl+C 时主任务被取消，抛出的是 CancelledError 而不是 KeyboardInterrupt，
+        # 因此在 finally 中收尾，确保未完成的闪念会话仍会被保存
+        print("\n👋 退出中...")
+        if warmup_task is not None:
+            warmup_task.cancel()
+        await plugin.terminate()
+        print("✅ 测试结束")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # 安装了 uvloop 时使用基于 libuv 的事件循环，未安装则沿用默认事件循环
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # 收尾已在 main() 的 finally 中完成
+        pass
\ No newline at end of file